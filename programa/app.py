@@ -1,4 +1,6 @@
 from ventanas.ventana_principal import VentanaPrincipal
+from modelos.motores import precalentar_motor
 
 if __name__ == '__main__':
+  precalentar_motor()
   vent = VentanaPrincipal()
@@ -0,0 +1,40 @@
+/** <module> Benchmark del acceso a casillas de la matriz
+ *
+ * Mide el costo promedio de obtener_valor_posicion/2 sobre matrices cuadradas de distinto
+ * tamaño. Como cada fila es un hecho indexado por su número y la columna se obtiene con
+ * arg/3, el tiempo por consulta debe mantenerse constante al crecer la matriz.
+ *
+ * Uso (desde la carpeta programa): swipl benchmarks/benchmark_celdas.pl
+ */
+
+:- consult('../logica.pl').
+
+:- initialization(main, main).
+
+main :-
+    format("~w~t~12|~w~n", ['Tamaño', 'ns/consulta']),
+    forall(member(Tamano, [10, 100, 500, 1000, 2000]), medir(Tamano)).
+
+% Genera una matriz de Tamano x Tamano con cruces en todas sus casillas.
+generar_matriz(Tamano) :-
+    limpiar_laberinto,
+    length(Valores, Tamano),
+    maplist(=(c), Valores),
+    findall(Valores, between(1, Tamano, _), Matriz),
+    definir_filas(Matriz).
+
+% Tiempo de Consultas accesos aleatorios, descontando el costo del ciclo y de random/1.
+medir(Tamano) :-
+    generar_matriz(Tamano),
+    Consultas = 200000,
+    set_random(seed(Tamano)),
+    statistics(cputime, T0),
+    forall(between(1, Consultas, _),
+           (X is random(Tamano), Y is random(Tamano))),
+    statistics(cputime, T1),
+    forall(between(1, Consultas, _),
+           (X is random(Tamano), Y is random(Tamano),
+            obtener_valor_posicion((X, Y), _))),
+    statistics(cputime, T2),
+    Nanosegundos is ((T2 - T1) - (T1 - T0)) / Consultas * 1.0e9,
+    format("~w~t~12|~2f~n", [Tamano, Nanosegundos]).
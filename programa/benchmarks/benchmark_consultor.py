@@ -0,0 +1,219 @@
+'''
+Módulo: benchmark_consultor.py
+Descripción: mide cada fase de la resolución de laberintos de tamaño y densidad crecientes,
+             cuenta las consultas enviadas a Prolog (MQI) y compara contra una ejecución base
+
+Uso (desde la raíz del repositorio):
+  python programa/benchmarks/benchmark_consultor.py -o base.json
+  python programa/benchmarks/benchmark_consultor.py -o actual.json --base base.json
+  python programa/benchmarks/benchmark_consultor.py --motor python --tamanos 50 200 1000
+'''
+import argparse
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import simplejson
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modelos.motores import MOTOR_PROLOG, MOTOR_PYTHON
+from modelos.generador_laberintos import generar_laberinto
+
+# Las fases de la resolución se miden dentro de Prolog (resolver_por_fases/2)
+FASES_RESOLUCION_PROLOG = ['run', 'terminar_laberinto', 'determinar_camino_solucion', 'encontrar_otros_caminos']
+FASES_PROLOG = ['cargar_laberinto'] + FASES_RESOLUCION_PROLOG + ['get_camino_solucion']
+FASES_PYTHON = ['cargar_matriz', 'set_posiciones_inic', 'solucionar', 'get_camino_solucion']
+
+TAMANOS = [10, 25, 50, 100]
+DENSIDADES = [0.4, 0.7]
+TOLERANCIA = 0.2 # Aumento relativo de tiempo a partir del cual se reporta una regresión
+TIEMPO_MINIMO = 0.001 # Las fases más rápidas que esto (en la base) no se comparan
+
+def medir_prolog(ruta):
+  """Resuelve la matriz con Consultor, fase por fase. Las fases de la resolución se ejecutan
+     en una sola consulta (resolver_por_fases/2) que retorna el tiempo de cada una.
+
+  Returns:
+      tuple: (solucionable, tiempos por fase, consultas por fase)
+  """
+
+  from modelos.consultor import Consultor
+  from modelos.instrumentacion import ConsultasInstrumentadas
+
+  consultor = Consultor(hilos=1)
+  instrumentadas = ConsultasInstrumentadas(consultor.pthread)
+  consultor.pthread = instrumentadas
+  tiempos = {}
+  consultas = {}
+
+  def fase(nombre, funcion):
+    instrumentadas.estadisticas.reiniciar()
+    inicio = time.perf_counter()
+    resultado = funcion()
+    tiempos[nombre] = time.perf_counter() - inicio
+    consultas[nombre] = sum(
+      datos['llamadas'] for datos in instrumentadas.estadisticas.predicados.values()
+    )
+    return resultado
+
+  try:
+    fase('cargar_laberinto', lambda: consultor.cargar_laberinto(ruta))
+    respuesta = fase(
+      'resolver_por_fases', lambda: consultor.pthread.query('resolver_por_fases(S, F)')[0]
+    )
+    # La consulta se reemplaza por el tiempo de cada fase medido en Prolog
+    del tiempos['resolver_por_fases']
+    for nombre, segundos in zip(FASES_RESOLUCION_PROLOG, respuesta['F']['args']):
+      tiempos[nombre] = float(segundos)
+    solucionable = respuesta['S'] == 'true'
+    if solucionable:
+      fase('get_camino_solucion', consultor.get_camino_solucion)
+  finally:
+    consultor.pthread = instrumentadas.pthread
+    consultor.cerrar_consultor()
+  return solucionable, tiempos, consultas
+
+def medir_python(ruta):
+  """Resuelve la matriz con el motor nativo, fase por fase
+
+  Returns:
+      tuple: (solucionable, tiempos por fase, consultas por fase)
+  """
+
+  from modelos.solucionador import Solucionador
+
+  solucionador = Solucionador()
+  tiempos = {}
+
+  def fase(nombre, funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    tiempos[nombre] = time.perf_counter() - inicio
+    return resultado
+
+  matriz = fase('cargar_matriz', lambda: solucionador.cargar_matriz(ruta))
+  fase('set_posiciones_inic', lambda: solucionador.set_posiciones_inic(matriz))
+  solucionable = fase('solucionar', solucionador.solucionar)
+  if solucionable:
+    fase('get_camino_solucion', solucionador.get_camino_solucion)
+  return bool(solucionable), tiempos, dict.fromkeys(tiempos, 0)
+
+def ejecutar(motor, tamanos, densidades, repeticiones, semilla):
+  """Genera las matrices y mide cada una, tomando la mediana de las repeticiones
+
+  Returns:
+      list<dict>: resultado de cada matriz
+  """
+
+  medir = medir_prolog if motor == MOTOR_PROLOG else medir_python
+  resultados = []
+  with tempfile.TemporaryDirectory() as carpeta:
+    for tamano in tamanos:
+      for densidad in densidades:
+        nombre = '{0}x{0}-d{1}'.format(tamano, densidad)
+        ruta = os.path.join(carpeta, nombre + '.txt')
+        # La mitad de las casillas transitables son cruces y la otra mitad de un solo sentido
+        generar_laberinto(ruta, tamano, tamano, semilla + tamano, densidad / 2, densidad / 2)
+
+        mediciones = [medir(ruta) for _ in range(0, repeticiones)]
+        solucionable, _, consultas = mediciones[0]
+        tiempos = {
+          fase: statistics.median(m[1][fase] for m in mediciones)
+          for fase in mediciones[0][1]
+        }
+        resultados.append({
+          'matriz': nombre,
+          'tamano': tamano,
+          'densidad': densidad,
+          'solucionable': solucionable,
+          'tiempos': tiempos,
+          'tiempo_total': sum(tiempos.values()),
+          'consultas': consultas,
+          'consultas_total': sum(consultas.values())
+        })
+        print('{:<16}{:>10.4f} s{:>10} consultas'.format(
+          nombre, resultados[-1]['tiempo_total'], resultados[-1]['consultas_total']
+        ), file=sys.stderr)
+  return resultados
+
+def comparar(resultados, base, tolerancia):
+  """Compara los resultados con una ejecución base y muestra las diferencias
+
+  Args:
+      resultados (list<dict>): resultados actuales
+      base (list<dict>): resultados de la ejecución base
+      tolerancia (float): aumento relativo permitido
+
+  Returns:
+      list<string>: descripción de cada regresión encontrada
+  """
+
+  base_por_matriz = {r['matriz']: r for r in base}
+  regresiones = []
+  print('{:<16}{:<30}{:>12}{:>12}{:>9}'.format('Matriz', 'Fase', 'Base (s)', 'Actual (s)', 'Razón'))
+  for resultado in resultados:
+    anterior = base_por_matriz.get(resultado['matriz'])
+    if anterior is None:
+      continue
+    for fase, tiempo in resultado['tiempos'].items():
+      tiempo_base = anterior['tiempos'].get(fase)
+      if tiempo_base is None:
+        continue
+      razon = tiempo / tiempo_base if tiempo_base > 0 else float('inf')
+      marca = ''
+      if tiempo_base >= TIEMPO_MINIMO and razon > 1 + tolerancia:
+        marca = '  REGRESIÓN'
+        regresiones.append('{} {}: {:.2f}x'.format(resultado['matriz'], fase, razon))
+      print('{:<16}{:<30}{:>12.4f}{:>12.4f}{:>8.2f}x{}'.format(
+        resultado['matriz'], fase, tiempo_base, tiempo, razon, marca
+      ))
+    if resultado['consultas_total'] > anterior['consultas_total']:
+      regresiones.append('{}: {} consultas MQI (antes {})'.format(
+        resultado['matriz'], resultado['consultas_total'], anterior['consultas_total']
+      ))
+  return regresiones
+
+def main(argumentos = None):
+  parser = argparse.ArgumentParser(description='Benchmark de las fases de resolución del laberinto')
+  parser.add_argument('--motor', choices=[MOTOR_PROLOG, MOTOR_PYTHON], default=MOTOR_PROLOG)
+  parser.add_argument('--tamanos', type=int, nargs='+', default=TAMANOS)
+  parser.add_argument('--densidades', type=float, nargs='+', default=DENSIDADES)
+  parser.add_argument('-r', '--repeticiones', type=int, default=3)
+  parser.add_argument('--semilla', type=int, default=0)
+  parser.add_argument('-o', '--salida', help='archivo JSON con los resultados')
+  parser.add_argument('--base', help='archivo JSON de una ejecución anterior para comparar')
+  parser.add_argument('--tolerancia', type=float, default=TOLERANCIA)
+  args = parser.parse_args(argumentos)
+
+  resultados = ejecutar(args.motor, args.tamanos, args.densidades, args.repeticiones, args.semilla)
+
+  if args.salida:
+    with open(args.salida, 'w') as file:
+      file.write(simplejson.dumps({
+        'motor': args.motor,
+        'fases': FASES_PROLOG if args.motor == MOTOR_PROLOG else FASES_PYTHON,
+        'repeticiones': args.repeticiones,
+        'semilla': args.semilla,
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'resultados': resultados
+      }, indent=2))
+
+  if args.base:
+    with open(args.base, 'r') as file:
+      base = simplejson.loads(file.read())
+    if base.get('motor') != args.motor:
+      print('Advertencia: la base se midió con el motor {}'.format(base.get('motor')), file=sys.stderr)
+    regresiones = comparar(resultados, base['resultados'], args.tolerancia)
+    for regresion in regresiones:
+      print('Regresión: ' + regresion, file=sys.stderr)
+    return 1 if regresiones else 0
+  return 0
+
+if __name__ == '__main__':
+  sys.exit(main())
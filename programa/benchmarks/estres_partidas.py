@@ -0,0 +1,108 @@
+'''
+Módulo: estres_partidas.py
+Descripción: prueba de estrés de DaoPartidasJson: varios procesos guardan partidas al mismo
+             tiempo en el mismo archivo y se verifica que no se pierda ninguna
+
+Uso (desde la raíz del repositorio):
+  python programa/benchmarks/estres_partidas.py
+  python programa/benchmarks/estres_partidas.py --procesos 16 --partidas 50 --formato json
+'''
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modelos.dao_partidas_json import DaoPartidasJson, FORMATO_JSON, FORMATO_JSONL
+
+def crear_partida(proceso, numero):
+  """Crea una partida identificable por proceso y número
+  """
+
+  return {
+    'jugador': 'proceso{}'.format(proceso),
+    'matriz': './matrices/matriz1.txt',
+    'estado': 'Exitoso',
+    'movimientos': [(0, columna) for columna in range(0, numero % 20 + 1)],
+    'tiempo': '00:00:{:02d}'.format(numero % 60),
+    'cantSugerencias': numero,
+    'fecha': '01/01/2024 00:00:00'
+  }
+
+def escribir_partidas(formato, path, proceso, cantidad):
+  """Guarda las partidas de un proceso, una por una como al terminar cada juego
+
+  Returns:
+      int: cantidad de partidas guardadas
+  """
+
+  dao = DaoPartidasJson(formato, path)
+  for numero in range(0, cantidad):
+    dao.agregar_partida(crear_partida(proceso, numero))
+  return cantidad
+
+def verificar(formato, path, procesos, cantidad):
+  """Verifica que estén todas las partidas esperadas, sin repetidas
+
+  Returns:
+      list<string>: errores encontrados
+  """
+
+  partidas = DaoPartidasJson(formato, path).obtener_partidas()
+  encontradas = {}
+  for partida in partidas:
+    clave = (partida['jugador'], partida['cantSugerencias'])
+    encontradas[clave] = encontradas.get(clave, 0) + 1
+
+  errores = []
+  for proceso in range(0, procesos):
+    for numero in range(0, cantidad):
+      esperada = crear_partida(proceso, numero)
+      veces = encontradas.get((esperada['jugador'], numero), 0)
+      if veces != 1:
+        errores.append('{} partida {}: {} veces'.format(esperada['jugador'], numero, veces))
+  if len(partidas) != procesos * cantidad:
+    errores.append('{} partidas, se esperaban {}'.format(len(partidas), procesos * cantidad))
+  return errores
+
+def main(argumentos = None):
+  parser = argparse.ArgumentParser(description='Prueba de estrés de escrituras concurrentes de partidas')
+  parser.add_argument('--procesos', type=int, default=8, help='Procesos que escriben a la vez')
+  parser.add_argument('--partidas', type=int, default=25, help='Partidas que guarda cada proceso')
+  parser.add_argument(
+    '--formato', choices=[FORMATO_JSON, FORMATO_JSONL], nargs='+',
+    default=[FORMATO_JSON, FORMATO_JSONL], help='Formatos a probar'
+  )
+  args = parser.parse_args(argumentos)
+
+  fallo = False
+  with tempfile.TemporaryDirectory() as carpeta:
+    for formato in args.formato:
+      # Carpetas separadas: el formato JSON Lines migraría el archivo del formato JSON
+      os.mkdir(os.path.join(carpeta, formato))
+      path = os.path.join(carpeta, formato, 'partidas.' + formato)
+      inicio = time.perf_counter()
+      with ProcessPoolExecutor(max_workers=args.procesos) as ejecutor:
+        futuros = [
+          ejecutor.submit(escribir_partidas, formato, path, proceso, args.partidas)
+          for proceso in range(0, args.procesos)
+        ]
+        total = sum(futuro.result() for futuro in futuros)
+      duracion = time.perf_counter() - inicio
+
+      errores = verificar(formato, path, args.procesos, args.partidas)
+      print('{}: {} partidas de {} procesos en {:.2f} s, {}'.format(
+        formato, total, args.procesos, duracion,
+        'sin pérdidas' if not errores else '{} errores'.format(len(errores))
+      ))
+      for error in errores[:20]:
+        print('  ' + error)
+      fallo = fallo or bool(errores)
+
+  return 1 if fallo else 0
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,44 @@
+'''
+Módulo: generar_laberintos.py
+Descripción: genera laberintos dirigidos aleatorios para pruebas de carga
+
+Uso:
+  python programa/generar_laberintos.py generadas --filas 2000 --columnas 2000 --semilla 7
+  python programa/generar_laberintos.py generadas --cantidad 100 --cruces 0.2 --unidireccional 0.4 --sin-solucion
+'''
+import argparse
+import os
+import sys
+
+from modelos.generador_laberintos import generar_laberinto
+
+def main(argumentos = None):
+  parser = argparse.ArgumentParser(description='Genera laberintos dirigidos aleatorios')
+  parser.add_argument('carpeta', help='carpeta donde se escriben las matrices')
+  parser.add_argument('--filas', type=int, default=50)
+  parser.add_argument('--columnas', type=int, default=50)
+  parser.add_argument('--semilla', type=int, default=0, help='semilla del primer laberinto')
+  parser.add_argument('--cantidad', type=int, default=1, help='laberintos a generar, con semillas consecutivas')
+  parser.add_argument('--cruces', type=float, default=0.35, help='proporción de cruces (c)')
+  parser.add_argument(
+    '--unidireccional', type=float, default=0.35, help='proporción de casillas de un sentido (u, d, l, r)'
+  )
+  parser.add_argument('--sin-solucion', action='store_true', help='garantiza que no exista solución')
+  args = parser.parse_args(argumentos)
+
+  os.makedirs(args.carpeta, exist_ok=True)
+  for semilla in range(args.semilla, args.semilla + args.cantidad):
+    ruta = os.path.join(args.carpeta, 'laberinto_{}x{}_{}.txt'.format(args.filas, args.columnas, semilla))
+    try:
+      generar_laberinto(
+        ruta, args.filas, args.columnas, semilla,
+        args.cruces, args.unidireccional, not args.sin_solucion
+      )
+    except ValueError as error:
+      print(error, file=sys.stderr)
+      return 1
+    print(ruta)
+  return 0
+
+if __name__ == '__main__':
+  sys.exit(main())
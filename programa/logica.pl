@@ -1,4 +1,3 @@
-
 /** <module> Resolución de laberintos dirigidos desde archivos .txt
  * 
  * Módulo que alberga la parte lógica encargada de la resolución de laberintos que son
@@ -18,15 +17,81 @@
 
 % :: Manejo de archivos y definición de la matriz :: %
 
+:- use_module(library(statistics)).
+:- use_module(library(time)).
+
+% Estado del laberinto y de la resolución. Se declaran dinámicos para que las consultas
+% fallen en lugar de lanzar existence_error en una sesión nueva (por ejemplo, si un límite
+% detiene la primera resolución antes de guardar el camino solución).
+:- dynamic fila_matriz/2.
+:- dynamic pared/1.
+:- dynamic posicion_inicial/1.
+:- dynamic posicion_actual/1.
+:- dynamic posicion_final/1.
+:- dynamic posicion_visitada/1.
+:- dynamic posicion_borrada/1.
+:- dynamic posicion_sig_a_procesar/1.
+:- dynamic sig_a_procesar/1.
+:- dynamic ultimo_cruce/1.
+:- dynamic cruce/1.
+:- dynamic cruce_pendiente/1.
+:- dynamic celda_sin_solucion/1.
+:- dynamic camino_solucion/1.
+:- dynamic solucion/1.
+:- dynamic padre/2.
+:- dynamic en_camino/1.
+
 % Read file and return a list of lists with pio
 lines([])           --> call(eos), !.
 lines([Line|Lines]) --> line(Line), lines(Lines).
 
 eos([], []).
 
-line([])     --> ( "\n" ; call(eos) ), !.
+% El fin de línea puede ser LF o CRLF; el '\r' no forma parte de la fila (igual que en cargador_matriz.py)
+line([])     --> ( "\r\n" ; "\n" ; call(eos) ), !.
 line([L|Ls]) --> [L], line(Ls).
 
+% Carga masiva del laberinto: lee el archivo, define la matriz, las paredes y las posiciones
+% inicial y final en una sola llamada. Solo retorna un resumen con dimensiones y extremos.
+cargar_laberinto(Ruta, resumen(Filas, Columnas, Inicio, Final)) :-
+    limpiar_laberinto,
+    phrase_from_file(lines(Lineas), Ruta),
+    maplist(codigos_a_fila, Lineas, Matriz),
+    definir_filas(Matriz),
+    length(Matriz, Filas),
+    (Matriz = [Primera|_] -> length(Primera, Columnas); Columnas = 0),
+    forall(nth0(X, Matriz, Fila),
+           forall(nth0(Y, Fila, Valor), definir_celda((X, Y), Valor))),
+    (posicion_inicial(Inicio) -> true; Inicio = (-1, -1)),
+    (posicion_final(Final) -> true; Final = (-1, -1)).
+
+codigos_a_fila(Codigos, Fila) :- maplist(char_code, Fila, Codigos).
+
+% Cada fila de la matriz se guarda como un hecho fila_matriz(X, fila(V0, V1, ...)).
+% El hecho queda indexado por el número de fila y la columna se accede con arg/3,
+% por lo que obtener el valor de una casilla no depende del tamaño de la matriz.
+% Las filas vacías (líneas en blanco) no se guardan: fila =.. [fila] daría el átomo fila
+% y arg/3 lanzaría un error de tipo en lugar de fallar. El resto conserva su número de fila.
+definir_filas(Matriz) :-
+    retractall(fila_matriz(_, _)),
+    forall((nth0(X, Matriz, Valores), Valores \== []),
+           (Fila =.. [fila|Valores], assertz(fila_matriz(X, Fila)))).
+
+definir_celda(Posicion, x) :- !, assertz(pared(Posicion)).
+definir_celda(Posicion, i) :- !,
+    assertz(posicion_inicial(Posicion)),
+    assertz(posicion_actual(Posicion)).
+definir_celda(Posicion, f) :- !, assertz(posicion_final(Posicion)).
+definir_celda(_, _).
+
+% Elimina el laberinto cargado previamente.
+limpiar_laberinto :-
+    retractall(fila_matriz(_, _)),
+    retractall(pared(_)),
+    retractall(posicion_inicial(_)),
+    retractall(posicion_actual(_)),
+    retractall(posicion_final(_)).
+
 % :: Predicados para definición de reglas :: %
 
 % Determinar camino de solución
@@ -64,9 +129,10 @@ agregar_posicion_visitada((X, Y)) :-
 
 % Obtiene el valor de una posición en la matriz
 obtener_valor_posicion((X, Y), Valor) :-
-    matriz(Matrix),
-    nth0(X, Matrix, Row),
-    nth0(Y, Row, Valor).
+    fila_matriz(X, Fila),
+    (integer(Y) ->
+        Y >= 0, Columna is Y + 1, arg(Columna, Fila, Valor);
+        arg(Columna, Fila, Valor), Y is Columna - 1).
 
 % :: Definición de reglas del laberinto respecto a movimientos :: %
 
@@ -186,15 +252,13 @@ llego_a_posicion_final :-
     posicion_final((X, Y)).
 
 % Inventir lista
-invertir_lista([], []).
-invertir_lista([X|Resto], ListaInvertida) :-
-    invertir_lista(Resto, RestoInvertido),
-    append(RestoInvertido, [X], ListaInvertida).
+invertir_lista(Lista, ListaInvertida) :-
+    reverse(Lista, ListaInvertida).
 
 % Retorna la lista de posiciones visitadas invertida
 pos_visitadas_inv(PosicionesVisitadasInv) :-
     posiciones_visitadas(PosicionesVisitadas),
-    invertir_lista(PosicionesVisitadas, PosicionesVisitadasInv).
+    reverse(PosicionesVisitadas, PosicionesVisitadasInv).
 
 % Retorna una lista de todas las celdas con valor 'c' de las posiciones visitadas
 cruces_visitadas(CrucesVisitadas) :-
@@ -238,37 +302,6 @@ cp(CrucesPendientes) :-
 distancia_manhattan((X1, Y1), (X2, Y2), Distancia) :-
     Distancia is abs(X1 - X2) + abs(Y1 - Y2).
 
-% Procesar cada elemento de las posiciones visitadas y obtener la distancia manhattan entre
-% cada valor y la posición siguiente. Si la distancia manhattan entre el valor actual y el
-% siguiente es 1, entonces se trata de un movimiento válido. Si la distancia manhattan es
-% mayor a 1, entonces elimina el valor actual de la lista de posiciones visitadas.
-procesar_posiciones_visitadas :-
-    pos_visitadas_inv(PosicionesVisitadas),
-    procesar_posiciones_visitadas_aux(PosicionesVisitadas).
-
-procesar_posiciones_visitadas_aux([]).
-procesar_posiciones_visitadas_aux([_]).
-procesar_posiciones_visitadas_aux([(X1, Y1), (X2, Y2)|Resto]) :-
-    distancia_manhattan((X1, Y1), (X2, Y2), Distancia),
-    Distancia > 1 -> retractall(posicion_visitada((X1, Y1))), definir_sig_a_procesar((X2, Y2)),
-                     agregar_posicion_borrada((X1, Y1));
-    procesar_posiciones_visitadas_aux([(X2, Y2)|Resto]).
-
-% Retorna true si desde la primera posición visitada se puede llegar a la posición final
-% de forma que no existe una distancia manhattan mayor a 1 entre las posiciones.
-solucion_valida :-
-    pos_visitadas_inv(PosicionesVisitadas),
-    posicion_final((Xf, Yf)),
-    solucion_valida_aux(PosicionesVisitadas, (Xf, Yf)).
-
-solucion_valida_aux([], _).
-solucion_valida_aux([_], _).
-solucion_valida_aux([(X1, Y1), (X2, Y2)|Resto], (Xf, Yf)) :-
-    distancia_manhattan((X1, Y1), (X2, Y2), Distancia),
-    Distancia > 1 -> false;
-    (X2 = Xf, Y2 = Yf) -> true;
-    solucion_valida_aux([(X2, Y2)|Resto], (Xf, Yf)).
-
 % Retorna true si una posición está en la lista de posiciones visitadas
 % y se encuentra antes de la posición final.
 posicion_visitada_antes_de_final((X, Y)) :-
@@ -283,12 +316,67 @@ es_anterior_en_lista(Previo, Limite, Lista) :-
     nth0(IndiceLimite, Lista, Limite),
     IndicePrevio < IndiceLimite.
 
-% Determina el camino solucion, si es solucion valida retorna true,
-% y si no, procesa las posiciones visitadas y vuelve a intentar.
+% Determina el camino solucion a partir de las posiciones visitadas. Una búsqueda en anchura
+% desde la posición inicial, solo por posiciones visitadas, registra el padre de cada posición;
+% el camino se reconstruye en un solo recorrido hacia atrás desde la posición final. Las
+% posiciones visitadas que no forman parte del camino se registran como posiciones borradas y
+% las visitadas quedan en el orden del camino (para guardar_camino_solucion).
 determinar_camino_solucion :-
-    solucion_valida -> true;
-    procesar_posiciones_visitadas,
-    determinar_camino_solucion.
+    posicion_inicial(Inicio),
+    posicion_final(Final),
+    retractall(padre(_, _)),
+    assertz(padre(Inicio, ninguno)),
+    buscar_padres([Inicio], [], Final),
+    padre(Final, _),
+    reconstruir_camino(Final, [], Camino),
+    retractall(padre(_, _)),
+    podar_posiciones_visitadas(Camino).
+
+% Búsqueda en anchura con una cola de dos listas (frente y parte trasera invertida).
+buscar_padres([], [], _) :- !.
+buscar_padres([], Atras, Final) :- !,
+    reverse(Atras, Frente),
+    buscar_padres(Frente, [], Final).
+buscar_padres([Final|_], _, Final) :- !.
+buscar_padres([Actual|Resto], Atras, Final) :-
+    findall(Siguiente,
+            (sucesor(Actual, Siguiente), posicion_visitada(Siguiente), \+ padre(Siguiente, _)),
+            Siguientes),
+    registrar_padres(Siguientes, Actual, Atras, NuevoAtras),
+    buscar_padres(Resto, NuevoAtras, Final).
+
+registrar_padres([], _, Atras, Atras).
+registrar_padres([Posicion|Resto], Padre, Atras, NuevoAtras) :-
+    (padre(Posicion, _) -> Atras1 = Atras;
+        assertz(padre(Posicion, Padre)), Atras1 = [Posicion|Atras]),
+    registrar_padres(Resto, Padre, Atras1, NuevoAtras).
+
+% Posición alcanzable con un movimiento, según el valor de la casilla (sin estado de visita).
+sucesor(Posicion, Siguiente) :-
+    obtener_valor_posicion(Posicion, Valor),
+    obtener_movimientos_de_valor(Valor, Movimientos),
+    member(Movimiento, Movimientos),
+    obtener_nueva_posicion(Posicion, Movimiento, Siguiente),
+    obtener_valor_posicion(Siguiente, ValorSiguiente),
+    ValorSiguiente \= x.
+
+reconstruir_camino(ninguno, Camino, Camino) :- !.
+reconstruir_camino(Posicion, Acumulado, Camino) :-
+    padre(Posicion, Padre),
+    reconstruir_camino(Padre, [Posicion|Acumulado], Camino).
+
+% Las posiciones visitadas fuera del camino pasan a ser posiciones borradas, y las posiciones
+% visitadas se vuelven a definir en el orden del camino.
+podar_posiciones_visitadas(Camino) :-
+    retractall(en_camino(_)),
+    forall(member(Posicion, Camino), assertz(en_camino(Posicion))),
+    posiciones_visitadas(PosicionesVisitadas),
+    reverse(PosicionesVisitadas, PosicionesEnOrden),
+    forall((member(Posicion, PosicionesEnOrden), \+ en_camino(Posicion)),
+           agregar_posicion_borrada(Posicion)),
+    retractall(en_camino(_)),
+    retractall(posicion_visitada(_)),
+    forall(member(Posicion, Camino), asserta(posicion_visitada(Posicion))).
 
 % Guarda cada una de las posiciones visitadas en la lista de camino solución hasta llegar al
 % punto final.
@@ -303,6 +391,165 @@ guardar_camino_solucion_aux([(X, Y)|Resto], (Xf, Yf)) :-
     assertz(camino_solucion((X, Y))),
     guardar_camino_solucion_aux(Resto, (Xf, Yf)).
 
+% Retorna (sin guardarlas) las posiciones visitadas hasta llegar al punto final.
+camino_hasta_final(Camino) :-
+    pos_visitadas_inv(PosicionesVisitadas),
+    posicion_final(Final),
+    camino_hasta_final_aux(PosicionesVisitadas, Final, Camino).
+
+camino_hasta_final_aux([], _, []).
+camino_hasta_final_aux([Final|_], Final, [Final]) :- !.
+camino_hasta_final_aux([Posicion|Resto], Final, [Posicion|Camino]) :-
+    camino_hasta_final_aux(Resto, Final, Camino).
+
+% Explora un cruce pendiente de forma independiente y retorna el camino hacia la posición
+% final que encontró ([] si no llegó). Lo usan las sesiones que exploran cruces en paralelo.
+explorar_cruce((X, Y), Camino) :-
+    reiniciar_base_de_conocimiento,
+    ignore(jugar_desde((X, Y))),
+    ignore(terminar_laberinto),
+    (llego_a_posicion_final ->
+        ignore(determinar_camino_solucion),
+        camino_hasta_final(Camino);
+        Camino = []).
+
+% Agrega al camino solución los caminos encontrados por otras sesiones.
+agregar_caminos_solucion(Caminos) :-
+    forall((member(Camino, Caminos), member(Posicion, Camino)),
+           assertz(camino_solucion(Posicion))).
+
+% Resuelve el laberinto cargado en una sola consulta, con los mismos pasos que
+% Consultor.solucionar: recorrido desde el inicio, camino solución y caminos desde los
+% cruces pendientes. Solucionable es true o false.
+resolver_laberinto(Solucionable) :-
+    resolver_desde_inicio(Solucionable),
+    (Solucionable == true ->
+        obtener_cruces_pendientes(CrucesPendientes),
+        forall(member(Cruce, CrucesPendientes), recorrer_cruce_pendiente(Cruce));
+        true).
+
+% Recorrido desde la posición inicial y camino solución, sin recorrer los cruces pendientes.
+resolver_desde_inicio(Solucionable) :-
+    ignore(run),
+    ignore(terminar_laberinto),
+    (llego_a_posicion_final ->
+        ignore(determinar_camino_solucion),
+        ignore(guardar_camino_solucion),
+        ignore(determinar_cruces_pendientes),
+        Solucionable = true;
+        Solucionable = false).
+
+% Busca un camino hacia la posición final desde un cruce pendiente y lo guarda en el camino solución.
+recorrer_cruce_pendiente(Cruce) :-
+    reiniciar_base_de_conocimiento,
+    ignore(jugar_desde(Cruce)),
+    ignore(terminar_laberinto),
+    (llego_a_posicion_final ->
+        ignore(determinar_camino_solucion),
+        ignore(guardar_camino_solucion);
+        true).
+
+% :: Límites de resolución :: %
+
+% Ejecuta Meta con un límite de inferencias y otro de tiempo en segundos (inf desactiva cada
+% uno). Limite es ninguno, inferencias o tiempo según cómo terminó la ejecución.
+llamar_con_limites(Meta, LimiteInferencias, LimiteTiempo, Limite) :-
+    catch(llamar_con_limite_tiempo(LimiteTiempo,
+                                   llamar_con_limite_inferencias(Meta, LimiteInferencias, Limite)),
+          time_limit_exceeded,
+          Limite = tiempo).
+
+llamar_con_limite_tiempo(inf, Meta) :- !,
+    once(Meta).
+llamar_con_limite_tiempo(Segundos, Meta) :-
+    call_with_time_limit(Segundos, once(Meta)).
+
+llamar_con_limite_inferencias(Meta, inf, ninguno) :- !,
+    ignore(Meta).
+llamar_con_limite_inferencias(Meta, Inferencias, Limite) :-
+    call_with_inference_limit(ignore(Meta), Inferencias, Resultado),
+    (Resultado == inference_limit_exceeded -> Limite = inferencias; Limite = ninguno).
+
+% Resuelve el laberinto con resolver_laberinto/1 o resolver_desde_inicio/1 (Resolver) dentro
+% de los límites. Si se alcanza un límite, el laberinto es solucionable solo si ya se había
+% guardado un camino solución (los caminos desde cruces pendientes quedan incompletos); si no,
+% las posiciones exploradas hasta ese momento se registran como posiciones borradas.
+resolver_con_limites(Resolver, LimiteInferencias, LimiteTiempo, Solucionable, Limite) :-
+    Meta =.. [Resolver, Resultado],
+    llamar_con_limites(Meta, LimiteInferencias, LimiteTiempo, Limite),
+    (Limite == ninguno -> Solucionable = Resultado;
+     camino_solucion(_) -> Solucionable = true;
+     forall(posicion_visitada(Posicion), agregar_posicion_borrada(Posicion)),
+     Solucionable = false).
+
+% Explora un cruce pendiente (explorar_cruce/2) dentro de los límites; Camino es [] si se alcanzan.
+explorar_cruce_con_limites(Cruce, LimiteInferencias, LimiteTiempo, Camino, Limite) :-
+    llamar_con_limites(explorar_cruce(Cruce, CaminoEncontrado), LimiteInferencias, LimiteTiempo, Limite),
+    (Limite == ninguno -> Camino = CaminoEncontrado; Camino = []).
+
+% :: Perfilado :: %
+
+% Resuelve el laberinto con el profiler de SWI-Prolog activo. Retorna las inferencias y el
+% tiempo de CPU de toda la resolución y, por predicado, un término
+% predicado(Nombre, Llamadas, Reintentos, TiempoPropio, TiempoAcumulado) con tiempos en segundos.
+perfilar_resolucion(Solucionable, Inferencias, Tiempo, Tabla) :-
+    reset_profiler,
+    statistics(inferences, Inferencias0),
+    statistics(cputime, Tiempo0),
+    setup_call_cleanup(profiler(_, cputime),
+                       resolver_laberinto(Solucionable),
+                       profiler(_, false)),
+    statistics(cputime, Tiempo1),
+    statistics(inferences, Inferencias1),
+    Inferencias is Inferencias1 - Inferencias0,
+    Tiempo is Tiempo1 - Tiempo0,
+    profile_data(Datos),
+    get_dict(summary, Datos, Resumen),
+    get_dict(nodes, Datos, Nodos),
+    findall(Fila, (member(Nodo, Nodos), fila_perfil(Nodo, Resumen, Fila)), Tabla).
+
+fila_perfil(Nodo, Resumen, predicado(Nombre, Llamadas, Reintentos, Propio, Acumulado)) :-
+    get_dict(predicate, Nodo, Predicado),
+    format(string(Nombre), "~q", [Predicado]),
+    get_dict(call, Nodo, Llamadas),
+    get_dict(redo, Nodo, Reintentos),
+    get_dict(ticks_self, Nodo, TicksPropios),
+    get_dict(ticks_siblings, Nodo, TicksHijos),
+    TicksAcumulados is TicksPropios + TicksHijos,
+    ticks_a_segundos(TicksPropios, Resumen, Propio),
+    ticks_a_segundos(TicksAcumulados, Resumen, Acumulado).
+
+ticks_a_segundos(Ticks, Resumen, Segundos) :-
+    get_dict(ticks, Resumen, TicksTotales),
+    get_dict(time, Resumen, TiempoMuestreado),
+    (TicksTotales > 0 ->
+        Segundos is Ticks / TicksTotales * TiempoMuestreado;
+        Segundos = 0).
+
+% Resuelve como resolver_laberinto/1 y mide el tiempo real (en segundos) de cada fase, para
+% benchmark_consultor.py: fases(Run, TerminarLaberinto, DeterminarCaminoSolucion, OtrosCaminos).
+% DeterminarCaminoSolucion incluye guardar el camino y determinar los cruces pendientes, y
+% OtrosCaminos es el recorrido de los cruces pendientes (encontrar_otros_caminos en Python).
+resolver_por_fases(Solucionable, fases(Run, Terminar, Determinar, OtrosCaminos)) :-
+    medir_fase(ignore(run), Run),
+    medir_fase(ignore(terminar_laberinto), Terminar),
+    (llego_a_posicion_final ->
+        medir_fase((ignore(determinar_camino_solucion),
+                    ignore(guardar_camino_solucion),
+                    ignore(determinar_cruces_pendientes)), Determinar),
+        medir_fase((obtener_cruces_pendientes(CrucesPendientes),
+                    forall(member(Cruce, CrucesPendientes), recorrer_cruce_pendiente(Cruce))),
+                   OtrosCaminos),
+        Solucionable = true;
+        Determinar = 0, OtrosCaminos = 0,
+        Solucionable = false).
+
+medir_fase(Meta, Segundos) :-
+    get_time(Inicio),
+    once(Meta),
+    get_time(Fin),
+    Segundos is Fin - Inicio.
+
 obtener_posiciones_borradas(PosicionesBorradas) :-
     findall((X, Y), posicion_borrada((X, Y)), PosicionesBorradas).
 
@@ -314,14 +561,9 @@ obtener_pos_no_solucion(PosicionesABorrar) :-
     findall((X, Y), (member((X, Y), PosicionesVisitadas), not(camino_solucion((X, Y)))), PosicionesNoCaminoSolucion),
     append(PosicionesBorradas, PosicionesNoCaminoSolucion, PosicionesABorrar).
 
-% Borra los elementos duplicados de una lista.
-borrar_duplicados([], []).
-borrar_duplicados([X|Xs], Ys) :-
-    member(X, Xs), !,
-    borrar_duplicados(Xs, Ys).
-
-borrar_duplicados([X|Xs], [X|Ys]) :-
-    borrar_duplicados(Xs, Ys).
+% Borra los elementos duplicados de una lista, conservando la primera aparición.
+borrar_duplicados(Lista, SinDuplicados) :-
+    list_to_set(Lista, SinDuplicados).
 
 obtener_camino_solucion(CaminoSolcion) :-
     findall((X, Y), camino_solucion((X, Y)), CaminoAux),
@@ -335,6 +577,20 @@ reiniciar_base_de_conocimiento :-
     retractall(posicion_borrada(_)),
     retractall(posicion_sig_a_procesar(_)).
 
+% Elimina todo el estado del laberinto actual (matriz y resolución), dejando la sesión
+% de Prolog lista para cargar otro laberinto.
+reiniciar_laberinto :-
+    limpiar_laberinto,
+    retractall(posicion_visitada(_)),
+    retractall(posicion_borrada(_)),
+    retractall(sig_a_procesar(_)),
+    retractall(cruce(_)),
+    retractall(ultimo_cruce(_)),
+    retractall(cruce_pendiente(_)),
+    retractall(celda_sin_solucion(_)),
+    retractall(camino_solucion(_)),
+    retractall(solucion(_)).
+
 jugar_desde((X, Y)) :-
     definir_posicion_actual((X, Y)),
     definir_posicion_inicial((X, Y)),
@@ -0,0 +1,238 @@
+'''
+Módulo: alcanzabilidad.py
+Clase: IndiceAlcanzabilidad
+Descripción: componentes fuertemente conexas del laberinto e índice de alcanzabilidad entre casillas
+'''
+import base64
+import sys
+from array import array
+
+# Cantidad máxima de componentes para calcular el cierre transitivo completo
+# (un conjunto de bits por componente, es decir componentes² bits en total)
+MAX_COMPONENTES_CIERRE = 16384
+
+# Componente de las casillas aisladas (sin movimientos de entrada ni de salida, como las paredes)
+SIN_COMPONENTE = -1
+
+class IndiceAlcanzabilidad:
+  """Condensa el grafo dirigido del laberinto en sus componentes fuertemente conexas
+     (un DAG) y precalcula qué componentes llegan a la posición final. Responde si una
+     casilla alcanza a otra y si el jugador quedó atrapado (ya no puede llegar a la posición final).
+     Las casillas aisladas (paredes) no forman parte de la condensación.
+  """
+
+  def __init__(self, componentes, aristas, indice_final):
+    """Construye el índice a partir de la condensación ya calculada.
+       Para calcularla desde un grafo se usa IndiceAlcanzabilidad.desde_grafo.
+
+    Args:
+        componentes (array): Componente de cada casilla, numeradas en orden topológico
+                             (SIN_COMPONENTE en las casillas aisladas)
+        aristas (list<list<int>>): Componentes sucesoras de cada componente
+        indice_final (int): Índice de la casilla final, -1 si no existe
+    """
+
+    self.componentes = componentes
+    self.aristas = aristas
+    self.indice_final = indice_final
+    self.cant_componentes = len(aristas)
+    self.calcular_llegada_final()
+    # El cierre transitivo solo lo necesita alcanza(), se calcula en su primera consulta
+    self.alcance = None
+    self.cierre_calculado = False
+
+  @classmethod
+  def desde_grafo(cls, grafo):
+    """Calcula las componentes fuertemente conexas (algoritmo de Kosaraju iterativo),
+       omitiendo las casillas aisladas: nunca se consultan y en los laberintos son la mayoría
+       de las componentes
+
+    Args:
+        grafo (GrafoDirigido): grafo del laberinto
+
+    Returns:
+        IndiceAlcanzabilidad: índice del laberinto
+    """
+
+    cant_celdas = grafo.cant_celdas
+    desplazamientos = grafo.desplazamientos
+    destinos = grafo.destinos
+    grafo.compilar_predecesores()
+    pred_desplazamientos = grafo.pred_desplazamientos
+    pred_origenes = grafo.pred_origenes
+
+    # Primera pasada: orden de finalización de una búsqueda en profundidad
+    orden = array('i')
+    visitada = bytearray(cant_celdas)
+    for inicio in range(0, cant_celdas):
+      if visitada[inicio]:
+        continue
+      if (desplazamientos[inicio] == desplazamientos[inicio + 1] and
+          pred_desplazamientos[inicio] == pred_desplazamientos[inicio + 1]):
+        continue # Casilla aislada, queda en SIN_COMPONENTE
+      visitada[inicio] = 1
+      pila = [inicio]
+      siguiente_arista = [desplazamientos[inicio]]
+      while pila:
+        actual = pila[-1]
+        k = siguiente_arista[-1]
+        if k < desplazamientos[actual + 1]:
+          siguiente_arista[-1] = k + 1
+          destino = destinos[k]
+          if not visitada[destino]:
+            visitada[destino] = 1
+            pila.append(destino)
+            siguiente_arista.append(desplazamientos[destino])
+        else:
+          pila.pop()
+          siguiente_arista.pop()
+          orden.append(actual)
+
+    # Segunda pasada sobre el grafo invertido, en orden inverso de finalización.
+    # Las componentes quedan numeradas en orden topológico de la condensación.
+    componentes = array('i', [SIN_COMPONENTE]) * cant_celdas
+    cant_componentes = 0
+    for inicio in reversed(orden):
+      if componentes[inicio] != SIN_COMPONENTE:
+        continue
+      componentes[inicio] = cant_componentes
+      pila = [inicio]
+      while pila:
+        actual = pila.pop()
+        for k in range(pred_desplazamientos[actual], pred_desplazamientos[actual + 1]):
+          origen = pred_origenes[k]
+          if componentes[origen] == SIN_COMPONENTE:
+            componentes[origen] = cant_componentes
+            pila.append(origen)
+      cant_componentes += 1
+
+    conjuntos = [set() for _ in range(0, cant_componentes)]
+    for origen in orden:
+      comp_origen = componentes[origen]
+      for k in range(desplazamientos[origen], desplazamientos[origen + 1]):
+        comp_destino = componentes[destinos[k]]
+        if comp_destino != comp_origen:
+          conjuntos[comp_origen].add(comp_destino)
+
+    return cls(componentes, [sorted(c) for c in conjuntos], grafo.indice_final)
+
+  def calcular_llegada_final(self):
+    """Precalcula, recorriendo las componentes en orden topológico inverso, cuáles llegan
+       a la componente final
+    """
+
+    cant = self.cant_componentes
+    comp_final = self.componentes[self.indice_final] if self.indice_final >= 0 else SIN_COMPONENTE
+
+    self.llega_final = bytearray(cant)
+    for comp in range(cant - 1, -1, -1):
+      if comp == comp_final or any(self.llega_final[d] for d in self.aristas[comp]):
+        self.llega_final[comp] = 1
+
+  def calcular_cierre(self):
+    """Calcula (si no son demasiadas componentes) el conjunto de componentes que alcanza
+       cada una, recorriéndolas en orden topológico inverso
+    """
+
+    cant = self.cant_componentes
+    self.cierre_calculado = True
+    if cant <= MAX_COMPONENTES_CIERRE:
+      alcance = [0] * cant
+      for comp in range(cant - 1, -1, -1):
+        bits = 1 << comp
+        for destino in self.aristas[comp]:
+          bits |= alcance[destino]
+        alcance[comp] = bits
+      self.alcance = alcance
+
+  def alcanza(self, origen, destino):
+    """Indica si desde la casilla origen se puede llegar a la casilla destino
+
+    Args:
+        origen (int): Índice de la casilla de origen
+        destino (int): Índice de la casilla destino
+
+    Returns:
+        bool: True si existe un camino dirigido del origen al destino
+    """
+
+    if origen < 0 or destino < 0:
+      return False
+    if origen == destino:
+      return True
+    comp_origen = self.componentes[origen]
+    comp_destino = self.componentes[destino]
+    if comp_origen == SIN_COMPONENTE or comp_destino == SIN_COMPONENTE:
+      # Una casilla aislada no alcanza ni es alcanzada por otra
+      return False
+    if comp_origen == comp_destino:
+      return True
+    if comp_destino < comp_origen:
+      # En orden topológico ninguna componente alcanza a una anterior
+      return False
+    if not self.cierre_calculado:
+      self.calcular_cierre()
+    if self.alcance is not None:
+      return bool((self.alcance[comp_origen] >> comp_destino) & 1)
+
+    # Sin cierre precalculado, búsqueda sobre el DAG de componentes
+    visitada = {comp_origen}
+    pila = [comp_origen]
+    while pila:
+      for siguiente in self.aristas[pila.pop()]:
+        if siguiente == comp_destino:
+          return True
+        if siguiente not in visitada and siguiente < comp_destino:
+          visitada.add(siguiente)
+          pila.append(siguiente)
+    return False
+
+  def atrapado(self, indice):
+    """Indica si desde la casilla ya no se puede llegar a la posición final
+
+    Args:
+        indice (int): Índice de la casilla
+
+    Returns:
+        bool: True si la casilla está en una región sin salida
+    """
+
+    if indice < 0:
+      return True
+    if indice == self.indice_final:
+      return False
+    componente = self.componentes[indice]
+    return componente == SIN_COMPONENTE or not self.llega_final[componente]
+
+  def a_dict(self):
+    """Convierte el índice a un diccionario serializable en JSON, para la caché
+
+    Returns:
+        dict: componentes (base64), aristas de la condensación e índice final
+    """
+
+    componentes = array('i', self.componentes)
+    if sys.byteorder == 'big':
+      componentes.byteswap()
+    return {
+      'componentes': base64.b64encode(componentes.tobytes()).decode('ascii'),
+      'aristas': self.aristas,
+      'indice_final': self.indice_final
+    }
+
+  @classmethod
+  def desde_dict(cls, datos):
+    """Reconstruye el índice guardado con a_dict
+
+    Args:
+        datos (dict): Índice serializado
+
+    Returns:
+        IndiceAlcanzabilidad: índice del laberinto
+    """
+
+    componentes = array('i')
+    componentes.frombytes(base64.b64decode(datos['componentes']))
+    if sys.byteorder == 'big':
+      componentes.byteswap()
+    return cls(componentes, datos['aristas'], datos['indice_final'])
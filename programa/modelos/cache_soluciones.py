@@ -0,0 +1,252 @@
+'''
+Módulo: cache_soluciones.py
+Clases: CacheSoluciones, SolucionCacheada
+Descripción: caché de soluciones de laberintos, indexada por el contenido del archivo de la matriz
+             y la configuración del motor que la resolvió
+'''
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import simplejson
+
+from modelos.cargador_matriz import leer_matriz, ruta_matriz
+from modelos.grafo import GrafoDirigido
+from modelos.alcanzabilidad import IndiceAlcanzabilidad
+from modelos.solucionador import MODOS_PRECALCULABLES
+
+VERSION_ENTRADA = 3
+
+def crear_entrada(consultor, matriz, solucionable, grafo = None):
+  """Construye la entrada de caché a partir de un consultor que ya resolvió el laberinto
+
+  Args:
+      consultor (Consultor | Solucionador): consultor con el laberinto resuelto
+      matriz (MatrizCompacta | list<list>): matriz del laberinto
+      solucionable (bool): resultado de consultor.solucionar()
+      grafo (GrafoDirigido): grafo ya compilado de la matriz (opcional)
+
+  Returns:
+      dict: entrada con camino solución, cruces pendientes, posiciones borradas,
+            índice de alcanzabilidad y el límite de resolución alcanzado (None si terminó completa)
+
+  Raises:
+      ValueError: si el modo del motor nativo no se puede precalcular (MODO_K_MINIMOS)
+  """
+
+  modo = getattr(consultor, 'modo', None)
+  if modo is not None and modo not in MODOS_PRECALCULABLES:
+    raise ValueError('El modo {} no se puede precalcular ni guardar en la caché'.format(modo))
+
+  if grafo is None:
+    grafo = GrafoDirigido(matriz)
+  entrada = {
+    'version': VERSION_ENTRADA,
+    'solucionable': solucionable,
+    'camino': [],
+    'cruces_pendientes': [],
+    'posiciones_borradas': [],
+    'alcanzabilidad': IndiceAlcanzabilidad.desde_grafo(grafo).a_dict(),
+    'limite': consultor.get_limite_alcanzado()
+  }
+  if not solucionable:
+    entrada['posiciones_borradas'] = [list(pos) for pos in consultor.get_posiciones_borradas()]
+    return entrada
+
+  entrada['camino'] = [list(pos) for pos in consultor.get_camino_solucion()]
+  entrada['cruces_pendientes'] = [list(pos) for pos in consultor.get_cruces_pendientes()]
+  entrada['posiciones_borradas'] = [list(pos) for pos in consultor.get_posiciones_borradas()]
+  return entrada
+
+class CacheSoluciones:
+  """Caché de soluciones en memoria (LRU) y en disco, indexada por el hash del
+     contenido del archivo de la matriz y de la configuración del motor
+  """
+
+  def __init__(self, capacidad = 32, directorio = './programa/cache'):
+    """Constructor
+
+    Args:
+        capacidad (int): Cantidad máxima de entradas en memoria
+        directorio (string): Carpeta donde se guardan las entradas en disco
+    """
+
+    self.capacidad = capacidad
+    self.directorio = directorio
+    self.entradas = OrderedDict()
+    # El juego resuelve en un hilo aparte mientras la ventana usa la caché
+    self.bloqueo = threading.Lock()
+
+  def calcular_clave(self, path, configuracion):
+    """Calcula la clave de una matriz a partir del contenido de su archivo y de la
+       configuración del motor (la misma matriz da soluciones distintas según el motor y el modo)
+
+    Args:
+        path (string): Ruta de la matriz
+        configuracion (dict): Configuración del motor (ver motores.configuracion_motor)
+
+    Returns:
+        string: Hash SHA-256 del contenido y la configuración
+    """
+
+    resumen = hashlib.sha256(simplejson.dumps(configuracion, sort_keys=True).encode('utf-8'))
+    with open(ruta_matriz(path), 'rb') as file:
+      resumen.update(file.read())
+    return resumen.hexdigest()
+
+  def ruta_entrada(self, clave):
+    """Ruta del archivo en disco de una entrada
+    """
+
+    return os.path.join(self.directorio, clave + '.json')
+
+  def obtener(self, clave):
+    """Busca una entrada en memoria y luego en disco
+
+    Args:
+        clave (string): Clave de la matriz
+
+    Returns:
+        dict: La entrada guardada, None si no existe
+    """
+
+    with self.bloqueo:
+      if clave in self.entradas:
+        self.entradas.move_to_end(clave)
+        return self.entradas[clave]
+
+      try:
+        with open(self.ruta_entrada(clave), 'r') as file:
+          entrada = simplejson.loads(file.read())
+      except (OSError, ValueError):
+        return None
+      if entrada.get('version') != VERSION_ENTRADA:
+        return None
+
+      self.agregar_en_memoria(clave, entrada)
+      return entrada
+
+  def guardar(self, clave, entrada):
+    """Guarda una entrada en memoria y en disco
+
+    Args:
+        clave (string): Clave de la matriz
+        entrada (dict): Entrada a guardar
+    """
+
+    with self.bloqueo:
+      self.agregar_en_memoria(clave, entrada)
+
+      os.makedirs(self.directorio, exist_ok=True)
+      ruta = self.ruta_entrada(clave)
+      ruta_temporal = ruta + '.tmp'
+      with open(ruta_temporal, 'w') as file:
+        file.write(simplejson.dumps(entrada))
+      os.replace(ruta_temporal, ruta)
+
+  def agregar_en_memoria(self, clave, entrada):
+    """Agrega una entrada en memoria, descartando la usada hace más tiempo si se excede la capacidad
+       (requiere tener el bloqueo)
+    """
+
+    self.entradas[clave] = entrada
+    self.entradas.move_to_end(clave)
+    while len(self.entradas) > self.capacidad:
+      self.entradas.popitem(last=False)
+
+# Caché compartida por todos los juegos de la aplicación
+cache_soluciones = CacheSoluciones()
+
+class SolucionCacheada:
+  """Responde las consultas del juego a partir de una entrada de caché,
+     con la misma interfaz que Consultor
+  """
+
+  def __init__(self, entrada):
+    """Constructor
+
+    Args:
+        entrada (dict): Entrada de caché de la matriz
+    """
+
+    self.entrada = entrada
+    self.camino_solucion = [tuple(pos) for pos in entrada['camino']]
+    self.celdas_solucion = set(self.camino_solucion)
+
+  def cerrar_consultor(self):
+    """No mantiene conexiones externas, existe por compatibilidad con Consultor
+    """
+
+  def definir_valores_iniciales(self, path, matriz = None, grafo = None):
+    """Carga la matriz, necesaria para validar movimientos
+
+    Args:
+        path (string): La ruta de la matriz para cargar
+        matriz (MatrizCompacta): La matriz ya leída, para no volver a leer el archivo (opcional)
+        grafo (GrafoDirigido): El grafo ya compilado de esa matriz (opcional)
+
+    Returns:
+        MatrizCompacta: La matriz, un byte por casilla
+    """
+
+    self.matriz = matriz if matriz is not None else leer_matriz(path)
+    self.grafo = grafo if grafo is not None else GrafoDirigido(self.matriz)
+    self.indice_alcanzabilidad = IndiceAlcanzabilidad.desde_dict(self.entrada['alcanzabilidad'])
+    return self.matriz
+
+  def solucionar(self):
+    """Retorna si el laberinto tiene solución, sin volver a resolverlo
+    """
+
+    return self.entrada['solucionable']
+
+  def get_camino_solucion(self):
+    """Retorna el camino solución en forma de lista de tuplas
+    """
+
+    return list(self.camino_solucion)
+
+  def get_cruces_pendientes(self):
+    """Retorna la lista de cruces pendientes de la resolución
+    """
+
+    return [tuple(pos) for pos in self.entrada['cruces_pendientes']]
+
+  def get_posiciones_borradas(self):
+    """Retorna las posiciones descartadas del camino solución
+    """
+
+    return [tuple(pos) for pos in self.entrada['posiciones_borradas']]
+
+  def get_limite_alcanzado(self):
+    """Retorna el límite que detuvo la resolución guardada, None si terminó completa
+    """
+
+    return self.entrada.get('limite')
+
+  def es_parte_solucion(self, posicion):
+    """Consulta si la posición indicada es parte del camino solución
+    """
+
+    return tuple(posicion) in self.celdas_solucion
+
+  def pedir_sugerencia(self, posicion):
+    """Retorna las sugerencias de movimiento de la posición (obtener_ayuda/2): sus sucesores
+       que forman parte de la solución
+    """
+
+    indice = self.grafo.indice(tuple(posicion))
+    if indice < 0:
+      return []
+    sucesores = [self.grafo.posicion(d) for d in self.grafo.sucesores(indice)]
+    return [pos for pos in sucesores if pos in self.celdas_solucion]
+
+  def es_movimiento_valido(self, posicion_inicial, posicion_destino):
+    """Verifica que una posicion destino sea un movimiento valido de una posicion inicial
+    """
+
+    return self.grafo.es_arista(
+      self.grafo.indice(posicion_inicial),
+      self.grafo.indice(posicion_destino)
+    )
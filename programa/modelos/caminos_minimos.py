@@ -0,0 +1,135 @@
+'''
+Módulo: caminos_minimos.py
+Descripción: búsqueda de caminos de longitud mínima sobre el grafo dirigido del laberinto
+'''
+import heapq
+from array import array
+
+def camino_minimo(grafo, origen, destino, nodos_bloqueados = None, aristas_bloqueadas = None,
+                  revisar = None):
+  """Camino con la menor cantidad de movimientos, por búsqueda en anchura con punteros al padre
+
+  Args:
+      grafo (GrafoDirigido): grafo del laberinto
+      origen (int): índice de la casilla de origen
+      destino (int): índice de la casilla destino
+      nodos_bloqueados (set<int>): casillas que no se pueden usar
+      aristas_bloqueadas (set<tuple>): pares (origen, destino) que no se pueden usar
+      revisar (function): recibe la cantidad de casillas procesadas al terminar la búsqueda,
+                          para llevar la cuenta de los límites de resolución (opcional)
+
+  Returns:
+      list<int>: índices del camino desde el origen hasta el destino, None si no existe
+  """
+
+  if origen < 0 or destino < 0:
+    return None
+  desplazamientos = grafo.desplazamientos
+  destinos = grafo.destinos
+  padres = array('i', [-1]) * grafo.cant_celdas
+  visitada = bytearray(grafo.cant_celdas)
+  if nodos_bloqueados:
+    for k in nodos_bloqueados:
+      visitada[k] = 1
+  visitada[origen] = 1
+
+  cola = [origen]
+  cabeza = 0
+  while cabeza < len(cola):
+    actual = cola[cabeza]
+    cabeza += 1
+    if actual == destino:
+      if revisar is not None:
+        revisar(cabeza)
+      camino = []
+      while actual != -1:
+        camino.append(actual)
+        actual = padres[actual]
+      camino.reverse()
+      return camino
+    for k in range(desplazamientos[actual], desplazamientos[actual + 1]):
+      siguiente = destinos[k]
+      if visitada[siguiente]:
+        continue
+      if aristas_bloqueadas and (actual, siguiente) in aristas_bloqueadas:
+        continue
+      visitada[siguiente] = 1
+      padres[siguiente] = actual
+      cola.append(siguiente)
+  if revisar is not None:
+    revisar(cabeza)
+  return None
+
+def celdas_caminos_minimos(grafo, origen, destino):
+  """Unión de todos los caminos de longitud mínima: las casillas cuya distancia desde
+     el origen más su distancia al destino es igual a la distancia mínima
+
+  Args:
+      grafo (GrafoDirigido): grafo del laberinto
+      origen (int): índice de la casilla de origen
+      destino (int): índice de la casilla destino
+
+  Returns:
+      tuple: (celdas, longitud), celdas en orden de distancia desde el origen;
+             ([], -1) si no existe camino
+  """
+
+  hacia = grafo.distancias_hacia(destino)
+  if origen < 0 or hacia[origen] < 0:
+    return [], -1
+  longitud = hacia[origen]
+  desde = grafo.distancias_desde(origen)
+
+  celdas = [
+    k for k in range(0, grafo.cant_celdas)
+    if desde[k] >= 0 and hacia[k] >= 0 and desde[k] + hacia[k] == longitud
+  ]
+  celdas.sort(key=lambda k: desde[k])
+  return celdas, longitud
+
+def k_caminos_minimos(grafo, origen, destino, k, revisar = None):
+  """Los k caminos simples más cortos (algoritmo de Yen sobre búsquedas en anchura).
+     A diferencia de los otros modos no es lineal ni se puede precalcular: realiza hasta
+     k * longitud búsquedas, por lo que debe ejecutarse con límites de resolución (revisar).
+     Los caminos se generan de a uno, así se conservan los ya encontrados si se agota un límite.
+
+  Args:
+      grafo (GrafoDirigido): grafo del laberinto
+      origen (int): índice de la casilla de origen
+      destino (int): índice de la casilla destino
+      k (int): cantidad de caminos a buscar
+      revisar (function): ver camino_minimo
+
+  Returns:
+      iterator<list<int>>: caminos encontrados, ordenados por longitud
+  """
+
+  if k <= 0:
+    return
+  primero = camino_minimo(grafo, origen, destino, revisar=revisar)
+  if primero is None:
+    return
+
+  yield primero
+  caminos = [primero]
+  candidatos = []
+  vistos = {tuple(primero)}
+  while len(caminos) < k:
+    previo = caminos[-1]
+    for i in range(0, len(previo) - 1):
+      raiz = previo[:i + 1]
+      aristas_bloqueadas = {
+        (camino[i], camino[i + 1]) for camino in caminos
+        if len(camino) > i + 1 and camino[:i + 1] == raiz
+      }
+      desvio = camino_minimo(grafo, previo[i], destino, set(raiz[:-1]), aristas_bloqueadas, revisar)
+      if desvio is None:
+        continue
+      candidato = raiz[:-1] + desvio
+      if tuple(candidato) not in vistos:
+        vistos.add(tuple(candidato))
+        heapq.heappush(candidatos, (len(candidato), candidato))
+    if not candidatos:
+      break
+    caminos.append(heapq.heappop(candidatos)[1])
+    yield caminos[-1]
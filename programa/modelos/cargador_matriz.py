@@ -0,0 +1,175 @@
+'''
+Módulo: cargador_matriz.py
+Clases: MatrizCompacta, FilaMatriz
+Descripción: lectura de los archivos de matrices desde Python, en un único búfer de bytes
+'''
+import os
+from array import array
+
+RETORNO_CARRO = 13 # '\r', presente en archivos con fin de línea CRLF
+
+def ruta_matriz(path):
+  """Resuelve la ruta de una matriz relativa al directorio del programa,
+     el mismo directorio de trabajo que utiliza Prolog
+
+  Args:
+      path (string): Ruta de la matriz, por ejemplo './matrices/matriz1.txt'
+
+  Returns:
+      string: Ruta utilizable desde Python
+  """
+
+  return os.path.join(os.getcwd(), 'programa', path)
+
+def leer_matriz(path):
+  """Carga un archivo de matriz en un único búfer de bytes
+
+  Args:
+      path (string): Ruta de la matriz
+
+  Returns:
+      MatrizCompacta: Matriz de solo lectura, indexable como matriz[fila][columna]
+  """
+
+  return MatrizCompacta(ruta_matriz(path))
+
+def filas_texto(matriz):
+  """Itera las filas de una matriz como texto, sea MatrizCompacta o lista de listas
+
+  Args:
+      matriz (MatrizCompacta | list<list>): Matriz a recorrer
+
+  Returns:
+      iterator<string>: Texto de cada fila
+  """
+
+  if isinstance(matriz, MatrizCompacta):
+    for fil in range(0, len(matriz)):
+      yield matriz.fila_texto(fil)
+  else:
+    for fila in matriz:
+      yield ''.join(fila)
+
+class FilaMatriz:
+  """Vista de solo lectura de una fila de MatrizCompacta, sin copiar sus bytes
+  """
+
+  __slots__ = ('datos', 'inicio', 'largo')
+
+  def __init__(self, datos, inicio, largo):
+    self.datos = datos
+    self.inicio = inicio
+    self.largo = largo
+
+  def __len__(self):
+    return self.largo
+
+  def __getitem__(self, col):
+    if col < 0:
+      col += self.largo
+    if not 0 <= col < self.largo:
+      raise IndexError('columna fuera de la matriz')
+    return chr(self.datos[self.inicio + col])
+
+  def __iter__(self):
+    for col in range(0, self.largo):
+      yield chr(self.datos[self.inicio + col])
+
+class MatrizCompacta:
+  """Matriz del laberinto sobre los bytes del archivo (un byte por casilla).
+     Solo se guarda el inicio y el largo de cada fila; acepta fin de línea LF o CRLF
+     y archivos con o sin salto de línea final.
+  """
+
+  def __init__(self, ruta):
+    """Lee el archivo e indexa sus filas
+
+    Args:
+        ruta (string): Ruta del archivo de la matriz
+    """
+
+    # Se copian los bytes y se cierra el archivo enseguida: un mapeo en memoria quedaría
+    # abierto mientras dure el juego o la repetición (en Windows impide sobrescribir la matriz)
+    with open(ruta, 'rb') as file:
+      self.datos = file.read()
+    self.indexar_filas()
+
+  def indexar_filas(self):
+    """Ubica el inicio y el largo (sin fin de línea) de cada fila
+    """
+
+    datos = self.datos
+    tamano = len(datos)
+    self.inicios = array('q')
+    self.largos = array('i')
+
+    inicio = 0
+    while inicio < tamano:
+      fin = datos.find(b'\n', inicio)
+      siguiente = fin + 1
+      if fin == -1:
+        fin = tamano
+        siguiente = tamano
+      largo = fin - inicio
+      if largo > 0 and datos[fin - 1] == RETORNO_CARRO:
+        largo -= 1
+      self.inicios.append(inicio)
+      self.largos.append(largo)
+      inicio = siguiente
+
+  def __len__(self):
+    return len(self.inicios)
+
+  def __getitem__(self, fil):
+    return FilaMatriz(self.datos, self.inicios[fil], self.largos[fil])
+
+  def __iter__(self):
+    for fil in range(0, len(self.inicios)):
+      yield self[fil]
+
+  def valor(self, fil, col):
+    """Valor de una casilla
+
+    Args:
+        fil (int): Fila de la casilla
+        col (int): Columna de la casilla
+
+    Returns:
+        string: Valor de la casilla, None si está fuera de la matriz
+    """
+
+    if 0 <= fil < len(self.inicios) and 0 <= col < self.largos[fil]:
+      return chr(self.datos[self.inicios[fil] + col])
+    return None
+
+  def fila_bytes(self, fil):
+    """Vista de memoria (sin copia) de los bytes de una fila
+    """
+
+    return memoryview(self.datos)[self.inicios[fil]:self.inicios[fil] + self.largos[fil]]
+
+  def fila_texto(self, fil):
+    """Texto de una fila completa, para recorrerla sin acceder casilla por casilla
+    """
+
+    inicio = self.inicios[fil]
+    return self.datos[inicio:inicio + self.largos[fil]].decode('latin-1')
+
+  def posiciones_valor(self, valor):
+    """Posiciones de todas las casillas con el valor indicado
+
+    Args:
+        valor (string): Valor a buscar
+
+    Returns:
+        list<tuple>: posiciones (fila, columna)
+    """
+
+    posiciones = []
+    for fil in range(0, len(self.inicios)):
+      texto = self.fila_texto(fil)
+      col = texto.find(valor)
+      while col != -1:
+        posiciones.append((fil, col))
+        col = texto.find(valor, col + 1)
+    return posiciones
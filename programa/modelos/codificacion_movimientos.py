@@ -0,0 +1,123 @@
+'''
+Módulo: codificacion_movimientos.py
+Descripción: codificación compacta de los movimientos de una partida: la primera posición y
+             2 bits por cada movimiento (arriba, derecha, abajo, izquierda) entre casillas vecinas
+'''
+import base64
+import struct
+from itertools import accumulate, chain
+
+# Encabezado: fila y columna de la primera posición y cantidad de posiciones
+ENCABEZADO = struct.Struct('<iiI')
+
+# Código de 2 bits de cada desplazamiento (fila, columna)
+CODIGOS_DESPLAZAMIENTO = {
+  (-1, 0): 0, # arriba
+  (0, 1): 1,  # derecha
+  (1, 0): 2,  # abajo
+  (0, -1): 3  # izquierda
+}
+DESPLAZAMIENTOS = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+
+# Desplazamientos de fila y de columna de los 4 movimientos empacados en cada valor de byte
+TABLA_FILAS = [
+  tuple(DESPLAZAMIENTOS[(byte >> (2 * i)) & 3][0] for i in range(0, 4)) for byte in range(0, 256)
+]
+TABLA_COLUMNAS = [
+  tuple(DESPLAZAMIENTOS[(byte >> (2 * i)) & 3][1] for i in range(0, 4)) for byte in range(0, 256)
+]
+
+def codificar_movimientos(movimientos):
+  """Codifica una lista de posiciones consecutivas en binario
+
+  Args:
+      movimientos (list<tuple>): Posiciones de la partida, cada una vecina de la anterior
+
+  Returns:
+      bytes: encabezado y movimientos empacados (4 por byte),
+             None si alguna posición no es vecina de la anterior
+  """
+
+  if not movimientos:
+    return ENCABEZADO.pack(0, 0, 0)
+
+  codigos = []
+  anterior = movimientos[0]
+  for actual in movimientos[1:]:
+    codigo = CODIGOS_DESPLAZAMIENTO.get((actual[0] - anterior[0], actual[1] - anterior[1]))
+    if codigo is None:
+      return None
+    codigos.append(codigo)
+    anterior = actual
+
+  empacados = bytearray((len(codigos) + 3) // 4)
+  for i, codigo in enumerate(codigos):
+    empacados[i >> 2] |= codigo << (2 * (i & 3))
+  return ENCABEZADO.pack(movimientos[0][0], movimientos[0][1], len(movimientos)) + bytes(empacados)
+
+def decodificar_movimientos(datos):
+  """Decodifica los movimientos codificados con codificar_movimientos
+
+  Args:
+      datos (bytes): Movimientos codificados
+
+  Returns:
+      list<tuple>: Posiciones de la partida
+  """
+
+  fila, columna, cantidad = ENCABEZADO.unpack_from(datos)
+  if cantidad == 0:
+    return []
+
+  # Los desplazamientos se obtienen por tabla (4 movimientos por byte) y las posiciones
+  # como sumas acumuladas, sin operar bit a bit en Python
+  empacados = memoryview(datos)[ENCABEZADO.size:]
+  cant_movimientos = cantidad - 1
+  filas = list(chain.from_iterable(TABLA_FILAS[byte] for byte in empacados))[:cant_movimientos]
+  columnas = list(chain.from_iterable(TABLA_COLUMNAS[byte] for byte in empacados))[:cant_movimientos]
+  return list(zip(
+    accumulate(filas, initial=fila),
+    accumulate(columnas, initial=columna)
+  ))
+
+def cantidad_movimientos(datos):
+  """Obtiene la cantidad de posiciones sin decodificar los movimientos
+
+  Args:
+      datos (bytes): Movimientos codificados
+
+  Returns:
+      int: Cantidad de posiciones
+  """
+
+  return ENCABEZADO.unpack_from(datos)[2]
+
+def codificar_movimientos_texto(movimientos):
+  """Codifica los movimientos en base64, para guardarlos en JSON
+
+  Returns:
+      string: Movimientos codificados, None si no se pueden codificar
+  """
+
+  datos = codificar_movimientos(movimientos)
+  return base64.b64encode(datos).decode('ascii') if datos is not None else None
+
+def decodificar_movimientos_texto(texto):
+  """Decodifica los movimientos guardados con codificar_movimientos_texto
+
+  Returns:
+      list<tuple>: Posiciones de la partida
+  """
+
+  return decodificar_movimientos(base64.b64decode(texto))
+
+def cantidad_movimientos_texto(texto):
+  """Obtiene la cantidad de posiciones de movimientos codificados en base64,
+     decodificando solo el encabezado
+
+  Returns:
+      int: Cantidad de posiciones
+  """
+
+  largo_encabezado = (ENCABEZADO.size + 2) // 3 * 4
+  return cantidad_movimientos(base64.b64decode(texto[:largo_encabezado]))
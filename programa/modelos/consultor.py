@@ -6,26 +6,81 @@ Autor: Hansol Antay Rostrán
 Fecha de creación: 27 de octubre, 2022
 '''
 from swiplserver import PrologMQI
+from concurrent.futures import ThreadPoolExecutor
 import os
+import time
+
+import simplejson
+
+from modelos.cargador_matriz import leer_matriz
+from modelos.instrumentacion import instrumentar, ConsultasInstrumentadas
+
+# Cantidad de sesiones de Prolog que exploran los cruces pendientes al mismo tiempo.
+# Con 1 se recorren uno por uno en la misma sesión.
+HILOS_CRUCES = 1
+
+# Límites de cada resolución, para que un laberinto patológico termine con el estado
+# "tiempo agotado" en lugar de congelar el juego. None desactiva el límite.
+LIMITE_INFERENCIAS = 200000000
+LIMITE_TIEMPO = 20 # segundos
+
+def formatear_limite(limite):
+  """Convierte un límite al término de Prolog correspondiente ('inf' si no hay límite)
+  """
+  
+  return 'inf' if limite is None else str(limite)
 
 class Consultor:
   """Permite gestionar llamadas a queries de la base de conocimiento en Prolog
   """
   
-  def __init__(self):
-    """Constructor principal sin parámetros
+  def __init__(self, hilos = HILOS_CRUCES, limite_inferencias = LIMITE_INFERENCIAS,
+               limite_tiempo = LIMITE_TIEMPO):
+    """Constructor principal
+
+    Args:
+        hilos (int): Sesiones que exploran los cruces pendientes en paralelo
+        limite_inferencias (int): Inferencias máximas de cada consulta de resolución, None sin límite
+        limite_tiempo (float): Segundos máximos de toda la resolución, None sin límite
     """
     
+    self.hilos = hilos
+    self.limite_inferencias = limite_inferencias
+    self.limite_tiempo = limite_tiempo
+    self.limite_alcanzado = None
+    self.fin_plazo = None
+    self.path = None
+    self.perfil = None
     self.mqi = PrologMQI()
-    self.pthread = self.mqi.create_thread()
+    self.pthread = instrumentar(self.mqi.create_thread())
+    self.pool = None # Pool al que pertenece, si fue prestado por PoolConsultores
     self.set_directorio()
   
   def cerrar_consultor(self):
-    """Cierra la conexión con Prolog
+    """Cierra la conexión con Prolog, o la devuelve al pool si fue prestada por uno.
+    Con la instrumentación activa, registra el resumen de las consultas realizadas.
+    """
+    
+    if isinstance(self.pthread, ConsultasInstrumentadas):
+      self.pthread.volcar_resumen()
+    if self.pool is not None:
+      self.pool.devolver(self)
+    else:
+      self.detener()
+  
+  def detener(self):
+    """Detiene el proceso de Prolog
     """
     
     self.pthread.halt_server()
     self.mqi.stop()
+  
+  def reiniciar(self):
+    """Elimina el laberinto cargado y el estado de su resolución,
+       sin reiniciar el proceso de Prolog
+    """
+    
+    self.pthread.query('reiniciar_laberinto')
     
   def set_directorio(self):
     """Define el directorio de trabajo de Prolog
@@ -49,77 +104,53 @@ class Consultor:
       'consult("logica.pl")'
     )
     
-  def definir_valores_iniciales(self, path):
+  def definir_valores_iniciales(self, path, matriz = None, grafo = None):
     """Define la matriz, las posiciones iniciales y finales de la matriz
 
     Args:
         path (string): La ruta de la matriz para cargar
+        matriz (MatrizCompacta): La matriz ya leída en Python, para no volver a leerla (opcional)
+        grafo (GrafoDirigido): No se utiliza, existe por compatibilidad con Solucionador
 
     Returns:
-        list<list>: La matriz con valores decodificados
+        MatrizCompacta: La matriz, leída localmente
     """
     
-    matriz = self.cargar_matriz(path)
-    self.set_posiciones_inic(matriz)
-    return matriz
-    
-  def cargar_matriz(self, path):
-    """Carga la matriz desde prolog, se decodifica y se define en la base de conocimiento
+    # Prolog lee el archivo por su cuenta
+    self.cargar_laberinto(path)
+    return matriz if matriz is not None else leer_matriz(path)
+
+  def cargar_laberinto(self, path):
+    """Carga el laberinto completo en Prolog con una sola consulta (cargar_laberinto/2).
+       Prolog lee el archivo y define la matriz, las paredes y las posiciones
+       inicial y final; a Python solo regresa un resumen.
 
     Args:
         path (string): Ruta del archivo con la matriz
 
     Returns:
-        list<list>: Matriz con los valores correctos
+        dict: filas, columnas, posicion_inicial y posicion_final del laberinto
     """
-    
-    # Se carga la matriz desde prolog, pero los valores están en ASCII (numéricos)
-    mat_cod = self.pthread.query(
-      "phrase_from_file(lines(Ls), {})".format(
-        '"' + path + '"'
+
+    self.path = path
+    resumen_json = self.pthread.query(
+      'cargar_laberinto("{}", R)'.format(path)
+    )[0]['R']['args']
+
+    self.resumen = {
+      'filas': int(resumen_json[0]),
+      'columnas': int(resumen_json[1]),
+      'posicion_inicial': (
+        int(resumen_json[2]['args'][0]),
+        int(resumen_json[2]['args'][1])
+      ),
+      'posicion_final': (
+        int(resumen_json[3]['args'][0]),
+        int(resumen_json[3]['args'][1])
       )
-    )[0]['Ls'] # Matriz codificada (ASCII)
-    
-    # Se decodifica la matriz, convirtiendo los valores ASCII a caracteres
-    mat_dec = [] # Matriz decodificada
-    for fila in mat_cod:
-      fila_dec = []
-      for valor in fila:
-        fila_dec.append(chr(valor))
-      mat_dec.append(fila_dec)
-      
-    self.pthread.query(
-      'asserta(matriz({}))'.format(mat_dec)
-    )
-    return mat_dec
-  
-  def set_posiciones_inic(self, matriz):
-    """Define las posiciones iniciales de paredes, de inicio y de fin de la matriz
-    y las guarda en la base de conocimiento
-    """
-    
-    posiciones = []
-    for i in range(0, len(matriz)):
-      for j in range(0, len(matriz[0])):
-        if (matriz[i][j] == 'x'):
-          posiciones.append((i, j))
-          self.pthread.query(
-            'assertz(pared({}))'.format((i, j))
-          )
-        elif (matriz[i][j] == 'i'):
-          self.pthread.query(
-            'assertz(posicion_inicial({}))'.format((i, j))
-          )
-          self.pthread.query(
-            'assertz(posicion_actual({}))'.format((i, j))
-          )
-        elif (matriz[i][j] == 'f'):
-          self.pthread.query(
-            'assertz(posicion_final({}))'.format((i, j))
-          )
-        else:
-          continue
-        
+    }
+    return self.resumen
+
   # ========== [ Consultas ] ==========
     
   def get_posiciones_paredes(self):
@@ -210,29 +241,152 @@ class Consultor:
     )[0]['X']
     
     return chr(valor_json)
+  
+  def get_posiciones_borradas(self):
+    """Retorna las posiciones visitadas que fueron descartadas del camino solución
+
+    Returns:
+        list<tuple>: lista de posiciones borradas
+    """
+    
+    borradas_json = self.pthread.query(
+      'posicion_borrada(X)'
+    )
+    
+    lista_borradas = []
+    if (bool(borradas_json) == False):
+      return lista_borradas
+    for json in borradas_json:
+      tupla = (
+        int(json['X']['args'][0]),
+        int(json['X']['args'][1])
+      )
+      lista_borradas.append(tupla)
+    return lista_borradas
+  
   # ========== [ Logica (Solucion) ] ==========
   
-  def solucionar(self):
+  def solucionar(self, perfilar = False, archivo_perfil = None):
     """Función principal que resuelve el laberinto desde prolog
     
+    Args:
+        perfilar (bool): Resuelve con el profiler de Prolog activo y guarda en self.perfil
+                         las inferencias, el tiempo y la tabla por predicado
+        archivo_perfil (string): Archivo JSON donde se escribe el perfil (opcional)
+    
     Returns:
         boolean: True si se encontró una solución, False si no
         
     Nota: retorna False si el laberinto actual no tiene solución
     """
-    self.pthread.query("run") # Movs desde posición inicial
-    self.pthread.query("terminar_laberinto")
-    
-    if (bool(self.pthread.query('llego_a_posicion_final'))):
-      self.pthread.query("determinar_camino_solucion")
-      self.pthread.query("guardar_camino_solucion")
-      self.pthread.query("determinar_cruces_pendientes")
-      
+    self.limite_alcanzado = None
+    self.fin_plazo = None
+    if perfilar:
+      return self.solucionar_perfilado(archivo_perfil)
+    
+    if self.limite_tiempo is not None:
+      self.fin_plazo = time.monotonic() + self.limite_tiempo
+    
+    if self.hilos <= 1:
+      return self.resolver_con_limites('resolver_laberinto')
+    
+    # Los cruces pendientes se reparten entre otras sesiones, con el tiempo que quede
+    solucionable = self.resolver_con_limites('resolver_desde_inicio')
+    if solucionable and self.limite_alcanzado is None:
       lista_cruces_pendientes = self.get_cruces_pendientes()
-      self.encontrar_otros_caminos(lista_cruces_pendientes)
-      return True
-    else:
-      return False
+      if lista_cruces_pendientes:
+        self.encontrar_otros_caminos_paralelo(lista_cruces_pendientes)
+    return solucionable
+  
+  def resolver_con_limites(self, resolver):
+    """Ejecuta la resolución en una sola consulta (resolver_con_limites/5) con los límites
+    de inferencias y de tiempo. Si se alcanza un límite queda registrado en self.limite_alcanzado
+    y se conserva lo resuelto hasta ese momento.
+
+    Args:
+        resolver (string): resolver_laberinto o resolver_desde_inicio
+
+    Returns:
+        boolean: True si se encontró una solución, False si no (o si se agotó el límite antes)
+    """
+    
+    respuesta = self.pthread.query(
+      'resolver_con_limites({}, {}, {}, S, L)'.format(
+        resolver, formatear_limite(self.limite_inferencias), self.tiempo_restante()
+      )
+    )[0]
+    if respuesta['L'] != 'ninguno':
+      self.limite_alcanzado = respuesta['L']
+    return respuesta['S'] == 'true'
+  
+  def tiempo_restante(self):
+    """Segundos que quedan del límite de tiempo de la resolución actual
+
+    Returns:
+        string: Término de Prolog con los segundos restantes, 'inf' si no hay límite
+    """
+    
+    if self.fin_plazo is None:
+      return formatear_limite(None)
+    return formatear_limite(max(self.fin_plazo - time.monotonic(), 0.001))
+  
+  def get_limite_alcanzado(self):
+    """Indica si la última resolución se detuvo por alcanzar un límite
+
+    Returns:
+        string: 'inferencias' o 'tiempo', None si terminó completa
+    """
+    
+    return self.limite_alcanzado
+  
+  def solucionar_perfilado(self, archivo_perfil = None):
+    """Resuelve el laberinto en una sola consulta (perfilar_resolucion/4) con el profiler
+    de SWI-Prolog activo. Los cruces pendientes se recorren en esta misma sesión.
+
+    Args:
+        archivo_perfil (string): Archivo JSON donde se escribe el perfil (opcional)
+
+    Returns:
+        boolean: True si se encontró una solución, False si no
+    """
+    
+    respuesta = self.pthread.query(
+      'perfilar_resolucion(S, I, T, Tabla)'
+    )[0]
+    
+    predicados = []
+    for json in respuesta['Tabla']:
+      nombre, llamadas, reintentos, propio, acumulado = json['args']
+      predicados.append({
+        'predicado': nombre,
+        'llamadas': int(llamadas),
+        'reintentos': int(reintentos),
+        'tiempo_propio': float(propio),
+        'tiempo_acumulado': float(acumulado)
+      })
+    predicados.sort(key=lambda fila: -fila['tiempo_propio'])
+    
+    self.perfil = {
+      'matriz': self.path,
+      'solucionable': respuesta['S'] == 'true',
+      'inferencias': int(respuesta['I']),
+      'tiempo': float(respuesta['T']),
+      'predicados': predicados
+    }
+    if archivo_perfil is not None:
+      with open(archivo_perfil, 'w') as file:
+        file.write(simplejson.dumps(self.perfil, indent=2))
+    return self.perfil['solucionable']
+  
+  def get_perfil(self):
+    """Retorna el perfil de la última resolución con perfilar=True
+
+    Returns:
+        dict: matriz, solucionable, inferencias, tiempo (s) y predicados con llamadas,
+              reintentos, tiempo_propio y tiempo_acumulado
+    """
+    
+    return self.perfil
   
   def encontrar_otros_caminos(self, lista_cruces):
     """Recibe una lista de posiciones que son cruces (c) en la matriz
@@ -242,6 +396,10 @@ class Consultor:
         lista_cruces (list<tuple>): lista de cruces a recorrer
     """
     
+    if self.hilos > 1 and len(lista_cruces) > 1:
+      self.encontrar_otros_caminos_paralelo(lista_cruces)
+      return
+    
     for cruce in lista_cruces:
       self.pthread.query('reiniciar_base_de_conocimiento')
       self.pthread.query(
@@ -253,6 +411,65 @@ class Consultor:
         self.pthread.query("guardar_camino_solucion")
       continue
   
+  def encontrar_otros_caminos_paralelo(self, lista_cruces):
+    """Reparte los cruces pendientes entre varias sesiones de Prolog (cada una con su
+    propio estado de posiciones visitadas) que los exploran al mismo tiempo, y
+    agrega los caminos encontrados al camino solución de esta sesión.
+
+    Args:
+        lista_cruces (list<tuple>): lista de cruces a recorrer
+    """
+    
+    from modelos.pool_consultores import pool_consultores
+    
+    hilos = min(self.hilos, len(lista_cruces))
+    grupos = [lista_cruces[i::hilos] for i in range(0, hilos)]
+    # Las sesiones de los grupos vuelven al pool en lugar de detenerse al terminar
+    pool_consultores.ampliar(self.hilos + 1)
+    
+    with ThreadPoolExecutor(max_workers=hilos) as executor:
+      resultados = list(executor.map(self.explorar_cruces, grupos))
+    
+    caminos = [camino for caminos_grupo in resultados for camino in caminos_grupo]
+    if caminos:
+      self.pthread.query(
+        'agregar_caminos_solucion({})'.format(caminos)
+      )
+  
+  def explorar_cruces(self, lista_cruces):
+    """Explora un grupo de cruces en una sesión de Prolog prestada por el pool
+
+    Args:
+        lista_cruces (list<tuple>): lista de cruces a recorrer
+
+    Returns:
+        list<list<tuple>>: caminos hacia la posición final encontrados
+    """
+    
+    from modelos.pool_consultores import pool_consultores
+    
+    sesion = pool_consultores.obtener()
+    try:
+      sesion.cargar_laberinto(self.path)
+      caminos = []
+      for cruce in lista_cruces:
+        respuesta = sesion.pthread.query(
+          'explorar_cruce_con_limites({}, {}, {}, C, L)'.format(
+            cruce, formatear_limite(self.limite_inferencias), self.tiempo_restante()
+          )
+        )[0]
+        if respuesta['L'] != 'ninguno':
+          self.limite_alcanzado = respuesta['L']
+          break
+        camino_json = respuesta['C']
+        if camino_json:
+          caminos.append([
+            (int(json['args'][0]), int(json['args'][1])) for json in camino_json
+          ])
+      return caminos
+    finally:
+      sesion.cerrar_consultor()
+  
   def get_camino_solucion(self):
     """Retorna el camino solución en forma de lista de tuplas
 
@@ -5,15 +5,176 @@ Descripción: Clase que permite gestionar la persistencia de partidas en formato
 Referencia utilizada: https://simplejson.readthedocs.io/en/latest/
 '''
 
+import errno
+import os
+import random
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from itertools import islice
+
 import simplejson
 
+try:
+  import fcntl
+except ImportError: # Windows
+  fcntl = None
+  import msvcrt
+
+from modelos.codificacion_movimientos import (
+  cantidad_movimientos_texto,
+  codificar_movimientos_texto,
+  decodificar_movimientos_texto
+)
+
+# Formatos de almacenamiento
+FORMATO_JSON = 'json' # Un arreglo con todas las partidas, se reescribe completo al guardar
+FORMATO_JSONL = 'jsonl' # Una partida por línea (JSON Lines), guardar una partida agrega una línea
+FORMATO_PREDETERMINADO = FORMATO_JSONL
+
+RUTAS_PREDETERMINADAS = {
+  FORMATO_JSON: './programa/partidas.json',
+  FORMATO_JSONL: './programa/partidas.jsonl'
+}
+
+# Reintentos ante contención (archivo bloqueado por otro proceso)
+TIEMPO_ESPERA_MAXIMO = 10 # segundos
+ESPERA_INICIAL = 0.01 # segundos, se duplica en cada reintento
+ESPERA_MAXIMA = 0.5 # segundos
+
+# Errores de contención: archivo bloqueado por otro proceso (flock: EAGAIN/EWOULDBLOCK;
+# msvcrt.locking y os.replace en Windows: EACCES/EDEADLK). Los demás se lanzan de inmediato.
+ERRORES_CONTENCION = {errno.EAGAIN, errno.EWOULDBLOCK, errno.EACCES, errno.EDEADLK}
+
+BLOQUE_INDICE = 1000 # Partidas que se agregan al índice de posiciones cada vez que hace falta
+
+def reintentar(operacion, descripcion):
+  """Ejecuta una operación de archivo, reintentando con espera exponencial (y una variación
+     aleatoria para no sincronizar a los procesos) mientras falle por contención
+     (ERRORES_CONTENCION); cualquier otro error se lanza sin reintentar
+
+  Args:
+      operacion (function): Operación sin argumentos, falla con OSError si el archivo está ocupado
+      descripcion (string): Descripción de la operación para el mensaje de error
+
+  Returns:
+      any: Resultado de la operación
+
+  Raises:
+      TimeoutError: si no se logra en TIEMPO_ESPERA_MAXIMO segundos
+  """
+
+  fin_plazo = time.monotonic() + TIEMPO_ESPERA_MAXIMO
+  espera = ESPERA_INICIAL
+  while True:
+    try:
+      return operacion()
+    except OSError as error:
+      if error.errno not in ERRORES_CONTENCION:
+        raise
+      if time.monotonic() >= fin_plazo:
+        raise TimeoutError('No se pudo {}: {}'.format(descripcion, error)) from error
+    time.sleep(espera * random.uniform(0.5, 1.5))
+    espera = min(espera * 2, ESPERA_MAXIMA)
+
+def bloquear_archivo(file):
+  """Intenta bloquear de forma exclusiva un archivo abierto, sin esperar
+
+  Raises:
+      OSError: si otro proceso tiene el bloqueo
+  """
+
+  if fcntl is not None:
+    fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+  else:
+    file.seek(0)
+    msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+
+def desbloquear_archivo(file):
+  """Libera el bloqueo obtenido con bloquear_archivo
+  """
+
+  if fcntl is not None:
+    fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+  else:
+    file.seek(0)
+    msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
 class DaoPartidasJson:
   """Dao correspondiente de las partidas jugadas en formato JSON
   """
-  
-  def __init__(self):
-    self.path = './programa/partidas.json'
-    
+
+  def __init__(self, formato = FORMATO_PREDETERMINADO, path = None):
+    """Constructor
+
+    Args:
+        formato (string): FORMATO_JSON o FORMATO_JSONL
+        path (string): Ruta del archivo, por defecto la del formato elegido
+    """
+
+    if formato not in RUTAS_PREDETERMINADAS:
+      raise ValueError('Formato de partidas desconocido: {}'.format(formato))
+    self.formato = formato
+    self.path = path if path is not None else RUTAS_PREDETERMINADAS[formato]
+
+    # Consultas por página: posición (en bytes) de cada partida en el archivo JSON Lines,
+    # o las partidas del arreglo JSON, y el avance de la última consulta con filtros
+    self.indice_lineas = []
+    self.bytes_indexados = 0
+    self.identidad_archivo = None
+    self.registros_json = []
+    self.cursor_filtros = None
+
+    if self.formato == FORMATO_JSONL:
+      self.migrar_desde_json(os.path.splitext(self.path)[0] + '.json')
+
+  def partida_a_dict(self, partida):
+    """Convierte los movimientos de una partida (tuplas) a un string base64 compacto
+       (ver codificacion_movimientos), sin modificar la partida original. Si algún movimiento
+       no es vecino del anterior se guardan como strings "(x, y)".
+
+    Args:
+        partida (Object): Partida con los movimientos en tuplas
+
+    Returns:
+        Object: Copia de la partida lista para serializar en JSON
+    """
+
+    partida = dict(partida)
+    codificados = codificar_movimientos_texto(partida['movimientos'])
+    if codificados is not None:
+      partida['movimientos'] = codificados
+    else:
+      partida['movimientos'] = [
+        "({}, {})".format(mov[0], mov[1]) for mov in partida['movimientos']
+      ]
+    return partida
+
+  def dict_a_partida(self, partida):
+    """Convierte los movimientos de una partida leída del JSON a tuplas. Acepta el
+       string base64 compacto y la lista de strings "(x, y)" de las partidas anteriores.
+
+    Args:
+        partida (Object): Partida leída del archivo
+
+    Returns:
+        Object: La partida con los movimientos en tuplas
+    """
+
+    if isinstance(partida['movimientos'], str):
+      partida['movimientos'] = decodificar_movimientos_texto(partida['movimientos'])
+      return partida
+
+    movimientos_tuplas = []
+    for mov in partida['movimientos']:
+      mov = mov.replace('(', '')
+      mov = mov.replace(')', '')
+      mov = mov.split(',')
+      movimientos_tuplas.append((int(mov[0]), int(mov[1])))
+    partida['movimientos'] = movimientos_tuplas
+    return partida
+
   def partidas_a_json_str(self, partidas):
     """Convierte una lista de partidas a un string en formato JSON.
        El objetivo de esta función es transformar la lista de tuplas
@@ -26,61 +187,350 @@ class DaoPartidasJson:
     Returns:
         list<Object>: las partidas con un formato correcto para JSON
     """
-    
-    movimientos_str = []
-    for partida in partidas:
-      movimientos = partida['movimientos']
-      for mov in movimientos:
-        tupla_str = ("({}, {})".format(mov[0], mov[1]))
-        movimientos_str.append(tupla_str)
-      partida['movimientos'] = movimientos_str
-      movimientos_str = []
-    return simplejson.dumps(partidas, indent=2)
-  
+
+    return simplejson.dumps([self.partida_a_dict(partida) for partida in partidas], indent=2)
+
   def json_a_partidas(self, partidas):
     """Obtiene una lista de partidas obtenidas de un archivo JSON
        y convierte la lista de strings en una lista de tuplas con las
        posición de los movimientos.
-       
+
     Args:
         partidas (list<Object>): Lista de partidas
-    
+
     Returns:
         list<Object>: Lista de partidas con los movimientos en tuplas
     """
-    
-    movimientos_tuplas = []
-    for partida in partidas:
-      movimientos = partida['movimientos']
-      for mov in movimientos:
-        mov = mov.replace('(', '')
-        mov = mov.replace(')', '')
-        mov = mov.split(',')
-        mov = (int(mov[0]), int(mov[1]))
-        movimientos_tuplas.append(mov)
-      partida['movimientos'] = movimientos_tuplas
-      movimientos_tuplas = []
-    return partidas
-  
+
+    return [self.dict_a_partida(partida) for partida in partidas]
+
+  def migrar_desde_json(self, path_json):
+    """Migración única del formato de arreglo JSON a JSON Lines: si el archivo JSON Lines
+       todavía no existe y el de arreglo sí, copia todas sus partidas (una por línea).
+       El archivo original se conserva.
+
+    Args:
+        path_json (string): Ruta del archivo en formato de arreglo JSON
+    """
+
+    if os.path.exists(self.path) or not os.path.exists(path_json):
+      return
+
+    with self.bloqueo():
+      # Otro proceso pudo haber migrado mientras se esperaba el bloqueo
+      if os.path.exists(self.path):
+        return
+      with open(path_json, 'r') as file:
+        partidas_json = simplejson.loads(file.read() or '[]')
+      self.escribir_atomico(''.join(simplejson.dumps(partida) + '\n' for partida in partidas_json))
+
+  @contextmanager
+  def bloqueo(self):
+    """Bloqueo exclusivo entre procesos para las escrituras, sobre un archivo '.lock' junto
+       al de partidas (el de partidas se reemplaza al escribir, por lo que no se bloquea).
+       Las lecturas no lo necesitan: siempre ven un archivo completo.
+    """
+
+    with open(self.path + '.lock', 'a+') as file:
+      reintentar(lambda: bloquear_archivo(file), 'bloquear ' + self.path)
+      try:
+        yield
+      finally:
+        desbloquear_archivo(file)
+
+  def escribir_atomico(self, contenido):
+    """Escribe el archivo de partidas completo en un archivo temporal y lo reemplaza con
+       os.replace, de modo que una interrupción nunca deja el archivo vacío o a medias
+
+    Args:
+        contenido (string): Contenido completo del archivo
+    """
+
+    # Nombre único por escritura; con 0o666 el sistema aplica la máscara del proceso,
+    # así un archivo nuevo queda con los mismos permisos que le daría open()
+    path_temporal = '{}.{}.tmp'.format(self.path, uuid.uuid4().hex)
+    descriptor = os.open(path_temporal, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+    try:
+      with os.fdopen(descriptor, 'w') as file:
+        file.write(contenido)
+        file.flush()
+        os.fsync(file.fileno())
+      # Si se reemplaza un archivo existente, se conservan sus permisos
+      if os.path.exists(self.path):
+        shutil.copymode(self.path, path_temporal)
+      # En Windows el reemplazo falla mientras otro proceso tiene abierto el archivo
+      reintentar(lambda: os.replace(path_temporal, self.path), 'reemplazar ' + self.path)
+    except BaseException:
+      if os.path.exists(path_temporal):
+        os.remove(path_temporal)
+      raise
+
+  def iterar_registros(self):
+    """Recorre las partidas tal como están guardadas (sin convertir los movimientos),
+       una por una y sin cargar todo el archivo. En formato JSON Lines se ignoran las
+       líneas incompletas (por ejemplo, la última línea de una escritura interrumpida).
+
+    Returns:
+        generator<Object>: Partidas leídas del archivo
+    """
+
+    if not os.path.exists(self.path):
+      return
+
+    if self.formato == FORMATO_JSON:
+      with open(self.path, 'r') as file:
+        partidas_json = simplejson.loads(file.read())
+      yield from partidas_json
+      return
+
+    with open(self.path, 'r') as file:
+      for linea in file:
+        if not linea.strip():
+          continue
+        try:
+          partida = simplejson.loads(linea)
+        except ValueError:
+          continue
+        yield partida
+
+  def iterar_partidas(self):
+    """Recorre las partidas guardadas una por una, sin cargar todo el archivo
+
+    Returns:
+        generator<Object>: Partidas con los movimientos en tuplas
+    """
+
+    for partida in self.iterar_registros():
+      yield self.dict_a_partida(partida)
+
   def obtener_partidas(self):
     """Obtiene las partidas guardadas en el archivo JSON
-    
+
     Returns:
         list<Object>: Lista de partidas
     """
-    
-    with open(self.path, 'r') as file:
-      partidas_json = simplejson.loads(file.read())
-      return self.json_a_partidas(partidas_json)
-  
+
+    return list(self.iterar_partidas())
+
+  def agregar_partida(self, partida):
+    """Guarda una partida nueva, con el archivo bloqueado para que las partidas que otros
+       procesos guardan al mismo tiempo no se pierdan. En formato JSON Lines solo se agrega
+       una línea al final del archivo; en formato JSON se reescribe el arreglo completo.
+
+    Args:
+        partida (Object): Partida a guardar
+    """
+
+    with self.bloqueo():
+      if self.formato == FORMATO_JSON:
+        partidas = self.obtener_partidas()
+        partidas.append(partida)
+        self.escribir_partidas(partidas)
+        return
+
+      linea = (simplejson.dumps(self.partida_a_dict(partida)) + '\n').encode('utf-8')
+      with open(self.path, 'a+b') as file:
+        # Si una escritura anterior quedó incompleta, la nueva partida inicia en otra línea
+        if file.tell() > 0:
+          file.seek(-1, os.SEEK_END)
+          if file.read(1) != b'\n':
+            linea = b'\n' + linea
+        file.write(linea)
+        file.flush()
+        os.fsync(file.fileno())
+
   def guardar_partidas(self, partidas):
-    """Guarda las partidas en el archivo JSON
+    """Guarda las partidas en el archivo JSON, reemplazando las existentes
 
     Args:
         partidas (list<Object>): lista de partidas a guardar
     """
-    
-    with open(self.path, 'w') as file:
-      file.write(self.partidas_a_json_str(partidas))
 
-    
\ No newline at end of file
+    with self.bloqueo():
+      self.escribir_partidas(partidas)
+
+  def escribir_partidas(self, partidas):
+    """Reemplaza el archivo con las partidas indicadas (requiere tener el bloqueo)
+
+    Args:
+        partidas (list<Object>): lista de partidas a guardar
+    """
+
+    if self.formato == FORMATO_JSON:
+      self.escribir_atomico(self.partidas_a_json_str(partidas))
+      return
+
+    self.escribir_atomico(
+      ''.join(simplejson.dumps(self.partida_a_dict(partida)) + '\n' for partida in partidas)
+    )
+
+  # ========== [ Consultas por página, misma interfaz que DaoPartidasSqlite ] ==========
+
+  def registro_a_resumen(self, id_partida, partida):
+    """Convierte una partida leída del archivo a su resumen, sin decodificar los movimientos
+
+    Args:
+        id_partida (int): Posición de la partida en el archivo
+        partida (Object): Partida leída del archivo
+
+    Returns:
+        Object: Partida con id y cantMovimientos en lugar de la lista de movimientos
+    """
+
+    resumen = {campo: valor for campo, valor in partida.items() if campo != 'movimientos'}
+    resumen['id'] = id_partida
+    if isinstance(partida['movimientos'], str):
+      resumen['cantMovimientos'] = cantidad_movimientos_texto(partida['movimientos'])
+    else:
+      resumen['cantMovimientos'] = len(partida['movimientos'])
+    return resumen
+
+  def identificar_archivo(self, estado):
+    """Identifica el archivo de partidas; cambia cuando se reemplaza (escribir_atomico)
+    """
+
+    return (estado.st_dev, estado.st_ino)
+
+  def actualizar_indice(self, limite = None):
+    """Actualiza el índice de las partidas. En formato JSON Lines solo se leen las líneas
+       que siguen a las ya indexadas (hasta tener limite partidas), y se reconstruye si el
+       archivo se reemplazó. En formato JSON se vuelve a leer el arreglo solo si el archivo cambió.
+
+    Args:
+        limite (int): Cantidad de partidas indexadas a partir de la cual se deja de leer
+                      (None para leer hasta el final)
+    """
+
+    try:
+      estado = os.stat(self.path)
+    except FileNotFoundError:
+      self.indice_lineas, self.bytes_indexados, self.registros_json = [], 0, []
+      self.identidad_archivo = None
+      self.cursor_filtros = None
+      return
+
+    if self.formato == FORMATO_JSON:
+      identidad = (self.identificar_archivo(estado), estado.st_mtime_ns, estado.st_size)
+      if identidad != self.identidad_archivo:
+        self.registros_json = list(self.iterar_registros())
+        self.identidad_archivo = identidad
+        self.cursor_filtros = None
+      return
+
+    identidad = self.identificar_archivo(estado)
+    if identidad != self.identidad_archivo or estado.st_size < self.bytes_indexados:
+      self.indice_lineas, self.bytes_indexados = [], 0
+      self.identidad_archivo = identidad
+      self.cursor_filtros = None
+    if estado.st_size == self.bytes_indexados:
+      return
+    if limite is not None and len(self.indice_lineas) >= limite:
+      return
+
+    with open(self.path, 'rb') as file:
+      file.seek(self.bytes_indexados)
+      posicion = self.bytes_indexados
+      for linea in file:
+        # Una línea sin salto todavía se está escribiendo, se indexa en la próxima actualización
+        if not linea.endswith(b'\n'):
+          break
+        if linea.strip():
+          try:
+            simplejson.loads(linea)
+            self.indice_lineas.append(posicion)
+          except ValueError:
+            pass
+        posicion += len(linea)
+        if limite is not None and len(self.indice_lineas) >= limite:
+          break
+      self.bytes_indexados = posicion
+
+  def registros_desde(self, id_partida):
+    """Recorre las partidas guardadas a partir de la indicada, sin leer las anteriores
+
+    Args:
+        id_partida (int): id de la primera partida
+
+    Returns:
+        generator<tuple>: (id, partida leída del archivo)
+    """
+
+    if self.formato == FORMATO_JSON:
+      self.actualizar_indice()
+      for id_actual in range(id_partida, len(self.registros_json)):
+        yield id_actual, self.registros_json[id_actual]
+      return
+
+    # El índice se extiende por bloques solo hasta donde se recorre
+    self.actualizar_indice(id_partida + BLOQUE_INDICE)
+    if id_partida >= len(self.indice_lineas):
+      return
+    identidad = self.identidad_archivo
+    with open(self.path, 'rb') as file:
+      if self.identificar_archivo(os.fstat(file.fileno())) != identidad:
+        # El archivo se reemplazó después de actualizar el índice
+        return
+      id_actual = id_partida
+      while True:
+        if id_actual >= len(self.indice_lineas):
+          self.actualizar_indice(id_actual + BLOQUE_INDICE)
+          if id_actual >= len(self.indice_lineas) or self.identidad_archivo != identidad:
+            return
+        file.seek(self.indice_lineas[id_actual])
+        yield id_actual, simplejson.loads(file.readline())
+        id_actual += 1
+
+  def listar_pagina(self, desplazamiento, cantidad, jugador = None, matriz = None, estado = None):
+    """Obtiene una página de partidas en orden de registro, sin cargar los movimientos.
+       Sin filtros se ubica la página con el índice de posiciones; con filtros se continúa
+       desde donde terminó la página anterior de la misma consulta.
+
+    Args:
+        desplazamiento (int): Cantidad de partidas a omitir
+        cantidad (int): Cantidad máxima de partidas de la página
+        jugador (string): Filtra por jugador (opcional)
+        matriz (string): Filtra por matriz (opcional)
+        estado (string): Filtra por estado (opcional)
+
+    Returns:
+        list<Object>: Partidas con id y cantMovimientos
+    """
+
+    filtros = [
+      (campo, valor) for campo, valor in
+      [('jugador', jugador), ('matriz', matriz), ('estado', estado)] if valor is not None
+    ]
+    if not filtros:
+      return [
+        self.registro_a_resumen(id_partida, partida)
+        for id_partida, partida in islice(self.registros_desde(desplazamiento), cantidad)
+      ]
+
+    id_inicial, omitir = 0, desplazamiento
+    if self.cursor_filtros is not None and self.cursor_filtros[0] == (filtros, desplazamiento):
+      id_inicial, omitir = self.cursor_filtros[1], 0
+    registros = (
+      (id_partida, partida) for id_partida, partida in self.registros_desde(id_inicial)
+      if all(partida.get(campo) == valor for campo, valor in filtros)
+    )
+    pagina = [
+      self.registro_a_resumen(id_partida, partida)
+      for id_partida, partida in islice(registros, omitir, omitir + cantidad)
+    ]
+    self.cursor_filtros = None
+    if pagina:
+      self.cursor_filtros = ((filtros, desplazamiento + len(pagina)), pagina[-1]['id'] + 1)
+    return pagina
+
+  def obtener_movimientos(self, id_partida):
+    """Obtiene los movimientos de una partida, leyendo solo su línea
+
+    Args:
+        id_partida (int): id de la partida (de listar_pagina)
+
+    Returns:
+        list<tuple>: movimientos de la partida
+    """
+
+    _, partida = next(self.registros_desde(id_partida), (None, None))
+    return self.dict_a_partida(partida)['movimientos'] if partida is not None else []
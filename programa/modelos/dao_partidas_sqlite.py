@@ -0,0 +1,315 @@
+'''
+Módulo: dao_partidas_sqlite.py
+Clase: DaoPartidasSqlite
+Descripción: persistencia de partidas en SQLite, con índices para las consultas de estadísticas
+             y los movimientos en una tabla aparte
+'''
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+import simplejson
+
+from modelos.codificacion_movimientos import (
+  codificar_movimientos as codificar_movimientos_binario,
+  decodificar_movimientos as decodificar_movimientos_binario
+)
+
+FORMATO_FECHA = '%d/%m/%Y %H:%M:%S' # Formato de las partidas (igual que en el JSON)
+FORMATO_FECHA_ISO = '%Y-%m-%d %H:%M:%S' # Formato guardado, ordenable como texto
+
+ESQUEMA = '''
+CREATE TABLE IF NOT EXISTS partidas (
+  id INTEGER PRIMARY KEY,
+  jugador TEXT NOT NULL,
+  matriz TEXT NOT NULL,
+  estado TEXT NOT NULL,
+  tiempo TEXT NOT NULL,
+  segundos INTEGER NOT NULL,
+  cant_sugerencias INTEGER NOT NULL,
+  cant_movimientos INTEGER NOT NULL,
+  fecha TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS movimientos (
+  partida_id INTEGER PRIMARY KEY REFERENCES partidas(id) ON DELETE CASCADE,
+  datos BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_partidas_jugador ON partidas(jugador, fecha);
+CREATE INDEX IF NOT EXISTS idx_partidas_matriz ON partidas(matriz, estado, segundos);
+CREATE INDEX IF NOT EXISTS idx_partidas_estado ON partidas(estado);
+CREATE INDEX IF NOT EXISTS idx_partidas_fecha ON partidas(fecha);
+'''
+
+COLUMNAS_PARTIDA = 'id, jugador, matriz, estado, tiempo, cant_sugerencias, cant_movimientos, fecha'
+
+def convertir_fecha(fecha, formato_origen, formato_destino):
+  """Convierte una fecha entre formatos; si no tiene el formato esperado se deja igual
+  """
+
+  try:
+    return datetime.strptime(fecha, formato_origen).strftime(formato_destino)
+  except ValueError:
+    return fecha
+
+def tiempo_a_segundos(tiempo):
+  """Convierte un tiempo 'HH:MM:SS' a segundos
+  """
+
+  horas, minutos, segundos = (int(valor) for valor in tiempo.split(':'))
+  return horas * 3600 + minutos * 60 + segundos
+
+class DaoPartidasSqlite:
+  """Dao de las partidas jugadas en una base de datos SQLite, con la misma interfaz
+     que DaoPartidasJson y consultas indexadas para las estadísticas
+  """
+
+  def __init__(self, path = './programa/partidas.sqlite3'):
+    """Constructor, crea las tablas e índices si no existen
+
+    Args:
+        path (string): Ruta de la base de datos
+    """
+
+    self.path = path
+    with closing(self.conectar()) as conexion, conexion:
+      conexion.executescript(ESQUEMA)
+
+  def conectar(self):
+    """Abre una conexión a la base de datos
+
+    Returns:
+        sqlite3.Connection: conexión con filas accesibles por nombre de columna
+    """
+
+    conexion = sqlite3.connect(self.path, timeout=30)
+    conexion.row_factory = sqlite3.Row
+    conexion.execute('PRAGMA foreign_keys = ON')
+    return conexion
+
+  def fila_a_partida(self, fila):
+    """Convierte una fila de la tabla partidas al formato de partida del juego, sin movimientos
+
+    Args:
+        fila (sqlite3.Row): Fila de la consulta
+
+    Returns:
+        Object: Partida con id y cantMovimientos en lugar de la lista de movimientos
+    """
+
+    return {
+      'id': fila['id'],
+      'jugador': fila['jugador'],
+      'matriz': fila['matriz'],
+      'estado': fila['estado'],
+      'tiempo': fila['tiempo'],
+      'cantSugerencias': fila['cant_sugerencias'],
+      'cantMovimientos': fila['cant_movimientos'],
+      'fecha': convertir_fecha(fila['fecha'], FORMATO_FECHA_ISO, FORMATO_FECHA)
+    }
+
+  def codificar_movimientos(self, movimientos):
+    """Convierte la lista de movimientos (tuplas) al valor guardado en la tabla movimientos:
+       binario compacto (ver codificacion_movimientos) o, si algún movimiento no es vecino
+       del anterior, texto JSON
+    """
+
+    datos = codificar_movimientos_binario(movimientos)
+    if datos is not None:
+      return datos
+    return simplejson.dumps([list(mov) for mov in movimientos])
+
+  def decodificar_movimientos(self, datos):
+    """Convierte el valor guardado en la tabla movimientos a una lista de tuplas.
+       Acepta el binario compacto y el texto JSON de las bases de datos anteriores.
+    """
+
+    if isinstance(datos, bytes):
+      return decodificar_movimientos_binario(datos)
+    return [tuple(mov) for mov in simplejson.loads(datos)]
+
+  def insertar_partidas(self, conexion, partidas):
+    """Inserta partidas (con sus movimientos) dentro de una transacción abierta
+    """
+
+    for partida in partidas:
+      cursor = conexion.execute(
+        'INSERT INTO partidas (jugador, matriz, estado, tiempo, segundos, cant_sugerencias, '
+        'cant_movimientos, fecha) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        (
+          partida['jugador'],
+          partida['matriz'],
+          partida['estado'],
+          partida['tiempo'],
+          tiempo_a_segundos(partida['tiempo']),
+          partida['cantSugerencias'],
+          len(partida['movimientos']),
+          convertir_fecha(partida['fecha'], FORMATO_FECHA, FORMATO_FECHA_ISO)
+        )
+      )
+      conexion.execute(
+        'INSERT INTO movimientos (partida_id, datos) VALUES (?, ?)',
+        (cursor.lastrowid, self.codificar_movimientos(partida['movimientos']))
+      )
+
+  # ========== [ Interfaz de DaoPartidasJson ] ==========
+
+  def iterar_partidas(self):
+    """Recorre las partidas guardadas (con sus movimientos) en orden de registro
+
+    Returns:
+        generator<Object>: Partidas con los movimientos en tuplas
+    """
+
+    with closing(self.conectar()) as conexion:
+      cursor = conexion.execute(
+        'SELECT p.jugador, p.matriz, p.estado, p.tiempo, p.cant_sugerencias, p.fecha, m.datos '
+        'FROM partidas p JOIN movimientos m ON m.partida_id = p.id ORDER BY p.id'
+      )
+      for fila in cursor:
+        yield {
+          'jugador': fila['jugador'],
+          'matriz': fila['matriz'],
+          'estado': fila['estado'],
+          'movimientos': self.decodificar_movimientos(fila['datos']),
+          'tiempo': fila['tiempo'],
+          'cantSugerencias': fila['cant_sugerencias'],
+          'fecha': convertir_fecha(fila['fecha'], FORMATO_FECHA_ISO, FORMATO_FECHA)
+        }
+
+  def obtener_partidas(self):
+    """Obtiene todas las partidas guardadas
+
+    Returns:
+        list<Object>: Lista de partidas
+    """
+
+    return list(self.iterar_partidas())
+
+  def agregar_partida(self, partida):
+    """Guarda una partida nueva
+
+    Args:
+        partida (Object): Partida a guardar
+    """
+
+    with closing(self.conectar()) as conexion, conexion:
+      self.insertar_partidas(conexion, [partida])
+
+  def guardar_partidas(self, partidas):
+    """Guarda las partidas, reemplazando las existentes
+
+    Args:
+        partidas (list<Object>): lista de partidas a guardar
+    """
+
+    with closing(self.conectar()) as conexion, conexion:
+      conexion.execute('DELETE FROM partidas')
+      self.insertar_partidas(conexion, partidas)
+
+  # ========== [ Consultas ] ==========
+
+  def contar_partidas(self, jugador = None, matriz = None, estado = None):
+    """Cuenta las partidas que cumplen los filtros indicados
+
+    Returns:
+        int: cantidad de partidas
+    """
+
+    condiciones, parametros = self.filtros(jugador, matriz, estado)
+    with closing(self.conectar()) as conexion:
+      return conexion.execute(
+        'SELECT COUNT(*) FROM partidas' + condiciones, parametros
+      ).fetchone()[0]
+
+  def listar_pagina(self, desplazamiento, cantidad, jugador = None, matriz = None, estado = None):
+    """Obtiene una página de partidas en orden de registro, sin cargar los movimientos
+
+    Args:
+        desplazamiento (int): Cantidad de partidas a omitir
+        cantidad (int): Cantidad máxima de partidas de la página
+        jugador (string): Filtra por jugador (opcional)
+        matriz (string): Filtra por matriz (opcional)
+        estado (string): Filtra por estado (opcional)
+
+    Returns:
+        list<Object>: Partidas con id y cantMovimientos
+    """
+
+    condiciones, parametros = self.filtros(jugador, matriz, estado)
+    with closing(self.conectar()) as conexion:
+      filas = conexion.execute(
+        'SELECT ' + COLUMNAS_PARTIDA + ' FROM partidas' + condiciones +
+        ' ORDER BY id LIMIT ? OFFSET ?',
+        parametros + [cantidad, desplazamiento]
+      ).fetchall()
+    return [self.fila_a_partida(fila) for fila in filas]
+
+  def mas_rapidas(self, matriz, cantidad = 10):
+    """Obtiene las partidas exitosas más rápidas de una matriz
+
+    Args:
+        matriz (string): Ruta de la matriz
+        cantidad (int): Cantidad de partidas
+
+    Returns:
+        list<Object>: Partidas ordenadas por tiempo, sin movimientos
+    """
+
+    with closing(self.conectar()) as conexion:
+      filas = conexion.execute(
+        'SELECT ' + COLUMNAS_PARTIDA + ' FROM partidas WHERE matriz = ? AND estado = ? '
+        'ORDER BY segundos, id LIMIT ?',
+        (matriz, 'Exitoso', cantidad)
+      ).fetchall()
+    return [self.fila_a_partida(fila) for fila in filas]
+
+  def historial_jugador(self, jugador, cantidad = 50):
+    """Obtiene las partidas más recientes de un jugador
+
+    Args:
+        jugador (string): Nombre del jugador
+        cantidad (int): Cantidad máxima de partidas
+
+    Returns:
+        list<Object>: Partidas de la más reciente a la más antigua, sin movimientos
+    """
+
+    with closing(self.conectar()) as conexion:
+      filas = conexion.execute(
+        'SELECT ' + COLUMNAS_PARTIDA + ' FROM partidas WHERE jugador = ? '
+        'ORDER BY fecha DESC, id DESC LIMIT ?',
+        (jugador, cantidad)
+      ).fetchall()
+    return [self.fila_a_partida(fila) for fila in filas]
+
+  def obtener_movimientos(self, id_partida):
+    """Obtiene los movimientos de una partida
+
+    Args:
+        id_partida (int): id de la partida (de listar_pagina, mas_rapidas o historial_jugador)
+
+    Returns:
+        list<tuple>: movimientos de la partida
+    """
+
+    with closing(self.conectar()) as conexion:
+      fila = conexion.execute(
+        'SELECT datos FROM movimientos WHERE partida_id = ?', (id_partida,)
+      ).fetchone()
+    return self.decodificar_movimientos(fila['datos']) if fila is not None else []
+
+  def filtros(self, jugador, matriz, estado):
+    """Construye la condición WHERE de los filtros indicados
+
+    Returns:
+        tuple: (condición SQL, lista de parámetros)
+    """
+
+    columnas = [('jugador', jugador), ('matriz', matriz), ('estado', estado)]
+    usadas = [(columna, valor) for columna, valor in columnas if valor is not None]
+    if not usadas:
+      return '', []
+    return (
+      ' WHERE ' + ' AND '.join('{} = ?'.format(columna) for columna, _ in usadas),
+      [valor for _, valor in usadas]
+    )
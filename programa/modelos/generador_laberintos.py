@@ -0,0 +1,114 @@
+'''
+Módulo: generador_laberintos.py
+Descripción: genera laberintos dirigidos aleatorios (reproducibles con una semilla) en el formato
+             de la carpeta matrices/, escribiendo fila por fila para soportar matrices muy grandes
+'''
+import random
+
+from modelos import reglas
+
+UNIDIRECCIONALES = ['u', 'd', 'l', 'r']
+
+def generar_laberinto(ruta, filas, columnas, semilla = 0, densidad_cruces = 0.35,
+                      proporcion_unidireccional = 0.35, solucionable = True):
+  """Escribe un laberinto aleatorio en un archivo. Solo se mantiene en memoria la fila actual.
+
+  Si es solucionable, se traza un camino garantizado que baja fila por fila: en cada fila
+  avanza horizontalmente desde la columna por la que entró hasta una columna aleatoria y desde
+  ahí baja a la siguiente. Si no es solucionable, el camino se detiene antes de la última fila
+  y la posición final queda rodeada de paredes.
+
+  Args:
+      ruta (string): Archivo de salida
+      filas (int): Cantidad de filas (al menos 2)
+      columnas (int): Cantidad de columnas (al menos 2)
+      semilla (int): Semilla del generador aleatorio
+      densidad_cruces (float): Proporción de casillas que son cruces (c)
+      proporcion_unidireccional (float): Proporción de casillas de un solo sentido (u, d, l, r)
+      solucionable (bool): True para garantizar un camino al final, False para garantizar que no exista
+
+  Returns:
+      dict: posicion_inicial y posicion_final del laberinto generado
+  """
+
+  if filas < 2 or columnas < 2:
+    raise ValueError('El laberinto debe tener al menos 2 filas y 2 columnas')
+  if densidad_cruces < 0 or proporcion_unidireccional < 0 or densidad_cruces + proporcion_unidireccional > 1:
+    raise ValueError('Las proporciones de cruces y casillas de un sentido deben sumar como máximo 1')
+
+  aleatorio = random.Random(semilla)
+  transitables = densidad_cruces + proporcion_unidireccional
+  prob_cruce_camino = densidad_cruces / transitables if transitables > 0 else 1
+
+  col_inicial = aleatorio.randrange(0, columnas)
+  col_final = aleatorio.randrange(0, columnas)
+  if not solucionable:
+    while col_final == col_inicial:
+      col_final = aleatorio.randrange(0, columnas)
+
+  def casilla_aleatoria():
+    azar = aleatorio.random()
+    if azar < densidad_cruces:
+      return reglas.CRUCE
+    if azar < transitables:
+      return aleatorio.choice(UNIDIRECCIONALES)
+    return reglas.PARED
+
+  def casilla_camino(movimiento):
+    # Casilla del camino garantizado que permite el movimiento indicado
+    if aleatorio.random() < prob_cruce_camino:
+      return reglas.CRUCE
+    return movimiento
+
+  with open(ruta, 'w') as file:
+    entrada = col_inicial
+    for fil in range(0, filas):
+      fila = [casilla_aleatoria() for _ in range(0, columnas)]
+      ultima = fil == filas - 1
+
+      if solucionable or fil < filas - 1:
+        if ultima:
+          salida = col_final
+        elif not solucionable and fil == filas - 2:
+          # La penúltima fila no toca la casilla sobre la posición final
+          if entrada < col_final:
+            salida = aleatorio.randrange(0, col_final)
+          else:
+            salida = aleatorio.randrange(col_final + 1, columnas)
+        else:
+          salida = aleatorio.randrange(0, columnas)
+          if not solucionable and fil == filas - 3:
+            while salida == col_final:
+              salida = aleatorio.randrange(0, columnas)
+
+        paso = 1 if salida > entrada else -1
+        horizontal = 'r' if paso == 1 else 'l'
+        for col in range(entrada, salida, paso):
+          fila[col] = casilla_camino(horizontal)
+        if solucionable or fil < filas - 2:
+          fila[salida] = casilla_camino('d')
+        else:
+          fila[salida] = reglas.CRUCE
+        entrada = salida
+
+      if not solucionable:
+        if fil == filas - 2:
+          fila[col_final] = reglas.PARED
+        elif ultima:
+          for col in (col_final - 1, col_final + 1):
+            if 0 <= col < columnas:
+              fila[col] = reglas.PARED
+
+      if fil == 0:
+        fila[col_inicial] = reglas.INICIO
+      if ultima:
+        fila[col_final] = reglas.FINAL
+
+      if fil > 0:
+        file.write('\n')
+      file.write(''.join(fila))
+
+  return {
+    'posicion_inicial': (0, col_inicial),
+    'posicion_final': (filas - 1, col_final)
+  }
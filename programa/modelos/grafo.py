@@ -0,0 +1,225 @@
+'''
+Módulo: grafo.py
+Clase: GrafoDirigido
+Descripción: grafo dirigido de sucesores del laberinto, compilado una sola vez por matriz
+'''
+from array import array
+
+from modelos import reglas
+from modelos.cargador_matriz import filas_texto
+
+class GrafoDirigido:
+  """Representación compacta (CSR) de los movimientos posibles del laberinto.
+     Cada casilla se identifica por el índice fila * cant_col + columna; los sucesores
+     de la casilla k son destinos[desplazamientos[k]:desplazamientos[k + 1]].
+  """
+
+  def __init__(self, matriz):
+    """Compila el grafo a partir de una matriz ya cargada
+
+    Args:
+        matriz (MatrizCompacta | list<list>): Matriz con el valor de cada casilla
+    """
+
+    self.cant_fil = len(matriz)
+    self.cant_col = len(matriz[0]) if self.cant_fil > 0 else 0
+    self.cant_celdas = self.cant_fil * self.cant_col
+    self.indice_inicial = -1
+    self.indice_final = -1
+    self.pred_desplazamientos = None
+    self.pred_origenes = None
+    self.compilar(matriz)
+
+  def compilar(self, matriz):
+    """Recorre la matriz una vez y construye los arreglos de desplazamientos y destinos
+
+    Args:
+        matriz (MatrizCompacta | list<list>): Matriz con el valor de cada casilla
+    """
+
+    cant_fil = self.cant_fil
+    cant_col = self.cant_col
+    desplazamientos = array('i', [0])
+    destinos = array('i')
+
+    # Desplazamientos (fila, columna) permitidos por cada valor de casilla
+    desp_por_valor = {
+      valor: [reglas.DESPLAZAMIENTOS[mov] for mov in movimientos]
+      for valor, movimientos in reglas.MOVIMIENTOS_POR_VALOR.items()
+    }
+
+    # Se recorre fila por fila con el texto de la fila anterior, actual y siguiente
+    filas = filas_texto(matriz)
+    anterior = None
+    actual = next(filas, None)
+    siguiente = next(filas, None)
+    for fil in range(0, cant_fil):
+      vecinas = {-1: anterior, 0: actual, 1: siguiente}
+      base = fil * cant_col
+      for col in range(0, cant_col):
+        valor = actual[col] if col < len(actual) else None
+        if valor == reglas.INICIO:
+          self.indice_inicial = base + col
+        elif valor == reglas.FINAL:
+          self.indice_final = base + col
+        for desp_fil, desp_col in desp_por_valor.get(valor, ()):
+          fila_dest = vecinas[desp_fil]
+          col_dest = col + desp_col
+          if (fila_dest is not None and 0 <= col_dest < cant_col and
+              col_dest < len(fila_dest) and fila_dest[col_dest] != reglas.PARED):
+            destinos.append(base + desp_fil * cant_col + col_dest)
+        desplazamientos.append(len(destinos))
+      anterior, actual, siguiente = actual, siguiente, next(filas, None)
+
+    self.desplazamientos = desplazamientos
+    self.destinos = destinos
+
+  def indice(self, posicion):
+    """Convierte una posición (fila, columna) en su índice dentro del grafo
+
+    Args:
+        posicion (tuple): Posición a convertir
+
+    Returns:
+        int: Índice de la casilla, -1 si está fuera de la matriz
+    """
+
+    fil, col = posicion
+    if 0 <= fil < self.cant_fil and 0 <= col < self.cant_col:
+      return fil * self.cant_col + col
+    return -1
+
+  def posicion(self, indice):
+    """Convierte un índice del grafo en su posición (fila, columna)
+
+    Args:
+        indice (int): Índice de la casilla
+
+    Returns:
+        tuple: Posición de la casilla
+    """
+
+    return divmod(indice, self.cant_col)
+
+  def sucesores(self, indice):
+    """Retorna los índices alcanzables con un movimiento desde una casilla
+
+    Args:
+        indice (int): Índice de la casilla de origen
+
+    Returns:
+        array: Índices de las casillas destino
+    """
+
+    return self.destinos[self.desplazamientos[indice]:self.desplazamientos[indice + 1]]
+
+  def es_arista(self, origen, destino):
+    """Indica si existe un movimiento directo entre dos casillas
+
+    Args:
+        origen (int): Índice de la casilla de origen
+        destino (int): Índice de la casilla destino
+
+    Returns:
+        bool: True si destino es sucesor de origen
+    """
+
+    if origen < 0 or destino < 0:
+      return False
+    for k in range(self.desplazamientos[origen], self.desplazamientos[origen + 1]):
+      if self.destinos[k] == destino:
+        return True
+    return False
+
+  def compilar_predecesores(self):
+    """Construye (una sola vez) el grafo invertido en el mismo formato CSR:
+       los predecesores de k son pred_origenes[pred_desplazamientos[k]:pred_desplazamientos[k + 1]]
+    """
+
+    if self.pred_desplazamientos is not None:
+      return
+
+    cant_celdas = self.cant_celdas
+    desplazamientos = self.desplazamientos
+    destinos = self.destinos
+
+    pred_desplazamientos = array('i', [0]) * (cant_celdas + 1)
+    for destino in destinos:
+      pred_desplazamientos[destino + 1] += 1
+    for k in range(0, cant_celdas):
+      pred_desplazamientos[k + 1] += pred_desplazamientos[k]
+
+    siguiente = array('i', pred_desplazamientos)
+    pred_origenes = array('i', [0]) * len(destinos)
+    for origen in range(0, cant_celdas):
+      for k in range(desplazamientos[origen], desplazamientos[origen + 1]):
+        destino = destinos[k]
+        pred_origenes[siguiente[destino]] = origen
+        siguiente[destino] += 1
+
+    self.pred_desplazamientos = pred_desplazamientos
+    self.pred_origenes = pred_origenes
+
+  def distancias_hacia(self, destino):
+    """Calcula la cantidad mínima de movimientos desde cada casilla hasta el destino,
+       con una búsqueda en anchura inversa desde el destino
+
+    Args:
+        destino (int): Índice de la casilla destino
+
+    Returns:
+        array: Distancia de cada casilla, -1 si no puede llegar al destino
+    """
+
+    distancias = array('i', [-1]) * self.cant_celdas
+    if destino < 0:
+      return distancias
+
+    self.compilar_predecesores()
+    pred_desplazamientos = self.pred_desplazamientos
+    pred_origenes = self.pred_origenes
+
+    distancias[destino] = 0
+    cola = [destino]
+    cabeza = 0
+    while cabeza < len(cola):
+      actual = cola[cabeza]
+      cabeza += 1
+      distancia = distancias[actual] + 1
+      for k in range(pred_desplazamientos[actual], pred_desplazamientos[actual + 1]):
+        origen = pred_origenes[k]
+        if distancias[origen] == -1:
+          distancias[origen] = distancia
+          cola.append(origen)
+    return distancias
+
+  def distancias_desde(self, origen):
+    """Calcula la cantidad mínima de movimientos desde el origen hasta cada casilla
+
+    Args:
+        origen (int): Índice de la casilla de origen
+
+    Returns:
+        array: Distancia de cada casilla, -1 si no es alcanzable desde el origen
+    """
+
+    distancias = array('i', [-1]) * self.cant_celdas
+    if origen < 0:
+      return distancias
+
+    desplazamientos = self.desplazamientos
+    destinos = self.destinos
+
+    distancias[origen] = 0
+    cola = [origen]
+    cabeza = 0
+    while cabeza < len(cola):
+      actual = cola[cabeza]
+      cabeza += 1
+      distancia = distancias[actual] + 1
+      for k in range(desplazamientos[actual], desplazamientos[actual + 1]):
+        destino = destinos[k]
+        if distancias[destino] == -1:
+          distancias[destino] = distancia
+          cola.append(destino)
+    return distancias
@@ -0,0 +1,172 @@
+'''
+Módulo: instrumentacion.py
+Clases: EstadisticasConsultas, ConsultasInstrumentadas
+Descripción: instrumentación opcional de las consultas enviadas a Prolog por MQI
+             (conteo por predicado, histogramas de latencia, tamaño de respuestas y consultas lentas)
+'''
+import logging
+import os
+import re
+import time
+
+import simplejson
+
+# Se activa con la variable de entorno LABERINTO_INSTRUMENTAR=1. Desactivada, los consultores
+# usan el hilo de MQI directamente y la instrumentación no tiene ningún costo.
+INSTRUMENTACION_ACTIVA = os.environ.get('LABERINTO_INSTRUMENTAR', '') == '1'
+
+# Consultas más lentas que este umbral (en milisegundos) se registran individualmente
+UMBRAL_CONSULTA_LENTA = float(os.environ.get('LABERINTO_UMBRAL_LENTA_MS', '100'))
+
+# Límites superiores (en milisegundos) de los intervalos del histograma de latencia
+INTERVALOS_LATENCIA = [0.5, 1, 5, 10, 50, 100, 500, 1000, float('inf')]
+
+PATRON_PREDICADO = re.compile(r'\s*([a-z][A-Za-z0-9_]*)')
+
+logger = logging.getLogger(__name__)
+
+def nombre_predicado(consulta):
+  """Obtiene el predicado principal de una consulta, por ejemplo 'obtener_ayuda' de 'obtener_ayuda((1, 2), X)'
+
+  Args:
+      consulta (string): Consulta enviada a Prolog
+
+  Returns:
+      string: Nombre del predicado
+  """
+
+  coincidencia = PATRON_PREDICADO.match(consulta)
+  return coincidencia.group(1) if coincidencia else consulta[:30]
+
+class EstadisticasConsultas:
+  """Acumula, por predicado, la cantidad de llamadas, el histograma de latencias
+     y el tamaño de las respuestas
+  """
+
+  def __init__(self):
+    self.reiniciar()
+
+  def reiniciar(self):
+    """Descarta las estadísticas acumuladas
+    """
+
+    self.predicados = {}
+
+  def registrar(self, consulta, duracion, tamano):
+    """Registra una consulta
+
+    Args:
+        consulta (string): Consulta enviada
+        duracion (float): Duración en segundos
+        tamano (int): Tamaño en bytes de la respuesta serializada en JSON
+    """
+
+    predicado = nombre_predicado(consulta)
+    datos = self.predicados.get(predicado)
+    if datos is None:
+      datos = {
+        'llamadas': 0,
+        'tiempo_total': 0.0,
+        'tiempo_maximo': 0.0,
+        'bytes_total': 0,
+        'histograma': [0] * len(INTERVALOS_LATENCIA)
+      }
+      self.predicados[predicado] = datos
+
+    milisegundos = duracion * 1000
+    datos['llamadas'] += 1
+    datos['tiempo_total'] += duracion
+    datos['tiempo_maximo'] = max(datos['tiempo_maximo'], duracion)
+    datos['bytes_total'] += tamano
+    for i, limite in enumerate(INTERVALOS_LATENCIA):
+      if milisegundos <= limite:
+        datos['histograma'][i] += 1
+        break
+
+    if milisegundos >= UMBRAL_CONSULTA_LENTA:
+      logger.warning('Consulta lenta (%.1f ms, %d bytes): %s', milisegundos, tamano, consulta[:200])
+
+  def resumen(self):
+    """Genera una tabla con las estadísticas de cada predicado, ordenada por tiempo total
+
+    Returns:
+        string: Resumen en texto
+    """
+
+    encabezado_histograma = ' '.join(
+      '<={:g}'.format(limite) if limite != float('inf') else '>' + '{:g}'.format(INTERVALOS_LATENCIA[-2])
+      for limite in INTERVALOS_LATENCIA
+    )
+    lineas = [
+      '{:<32}{:>9}{:>12}{:>11}{:>11}{:>12}  {}'.format(
+        'Predicado', 'Llamadas', 'Total (ms)', 'Prom (ms)', 'Máx (ms)', 'Bytes', 'Histograma ms ' + encabezado_histograma
+      )
+    ]
+    ordenados = sorted(self.predicados.items(), key=lambda item: -item[1]['tiempo_total'])
+    for predicado, datos in ordenados:
+      lineas.append('{:<32}{:>9}{:>12.2f}{:>11.3f}{:>11.2f}{:>12}  {}'.format(
+        predicado,
+        datos['llamadas'],
+        datos['tiempo_total'] * 1000,
+        datos['tiempo_total'] * 1000 / datos['llamadas'],
+        datos['tiempo_maximo'] * 1000,
+        datos['bytes_total'],
+        ' '.join(str(cantidad) for cantidad in datos['histograma'])
+      ))
+    total_llamadas = sum(datos['llamadas'] for datos in self.predicados.values())
+    total_tiempo = sum(datos['tiempo_total'] for datos in self.predicados.values())
+    lineas.append('Total: {} consultas, {:.2f} ms'.format(total_llamadas, total_tiempo * 1000))
+    return '\n'.join(lineas)
+
+class ConsultasInstrumentadas:
+  """Envuelve el hilo de MQI de un Consultor (PrologThread) y mide cada consulta.
+     El resto de los métodos del hilo se delegan sin cambios.
+  """
+
+  def __init__(self, pthread):
+    """Constructor
+
+    Args:
+        pthread (PrologThread): Hilo de MQI a instrumentar
+    """
+
+    self.pthread = pthread
+    self.estadisticas = EstadisticasConsultas()
+
+  def query(self, consulta, *args, **kwargs):
+    """Ejecuta la consulta en Prolog y registra su latencia y el tamaño de su respuesta
+    """
+
+    inicio = time.perf_counter()
+    respuesta = self.pthread.query(consulta, *args, **kwargs)
+    duracion = time.perf_counter() - inicio
+    tamano = len(simplejson.dumps(respuesta)) if respuesta not in (True, False) else 0
+    self.estadisticas.registrar(consulta, duracion, tamano)
+    return respuesta
+
+  def volcar_resumen(self):
+    """Registra el resumen de las consultas realizadas y reinicia las estadísticas
+    """
+
+    if self.estadisticas.predicados:
+      logger.info('Consultas a Prolog:\n%s', self.estadisticas.resumen())
+    self.estadisticas.reiniciar()
+
+  def __getattr__(self, nombre):
+    return getattr(self.pthread, nombre)
+
+def instrumentar(pthread):
+  """Envuelve el hilo de MQI si la instrumentación está activa
+
+  Args:
+      pthread (PrologThread): Hilo de MQI
+
+  Returns:
+      PrologThread | ConsultasInstrumentadas: el mismo hilo si está desactivada
+  """
+
+  if INSTRUMENTACION_ACTIVA:
+    if not logging.getLogger().handlers:
+      logging.basicConfig(level=logging.INFO)
+    return ConsultasInstrumentadas(pthread)
+  return pthread
@@ -8,17 +8,35 @@ Fecha de creación: 27 de octubre, 2022
 import tkinter as tk
 from tkinter import messagebox
 from datetime import datetime
+import queue
+import threading
 
-from modelos.dao_partidas_json import DaoPartidasJson
-from modelos.consultor import Consultor
+from modelos.persistencia import crear_dao
+from modelos.motores import crear_consultor, configuracion_motor, MOTOR_PREDETERMINADO
+from modelos.cache_soluciones import cache_soluciones, crear_entrada, SolucionCacheada
+from modelos.cargador_matriz import leer_matriz
+from modelos.grafo import GrafoDirigido
+from modelos import reglas
 import ventanas.ventana_config as vc
 
+# Movimiento correspondiente a cada tecla de flecha
+TECLAS_MOVIMIENTO = {
+  'Up': 'arriba',
+  'Down': 'abajo',
+  'Left': 'izquierda',
+  'Right': 'derecha'
+}
+
+# Cada cuántos milisegundos la ventana revisa si la solución en segundo plano ya está lista
+INTERVALO_REVISION = 100
+
 class Juego:
   """Clase juego para el laberinto
   """
-  def __init__(self, nombre_usuario, ruta_matriz):
+  def __init__(self, nombre_usuario, ruta_matriz, motor = MOTOR_PREDETERMINADO):
     self.nombre_usuario = nombre_usuario
     self.ruta_matriz = ruta_matriz
+    self.motor = motor
     
     self.ventana = tk.Tk()
     self.ventana.title('Juego')
@@ -34,6 +52,12 @@ class Juego:
     self.movimientos = []
     self.cant_sugerencias = 0
     
+    # La solución se obtiene en un hilo aparte; mientras tanto se puede jugar
+    self.cprolog = None
+    self.indice_alcanzabilidad = None
+    self.resultados_solucion = queue.Queue()
+    self.id_revision = None
+    
     # Frame para la ventana
     self.frame = tk.Frame(self.ventana, bg = 'light sky blue')
     self.frame.place(
@@ -100,16 +124,43 @@ class Juego:
       x = 708, y = 450
     )
     
-    self.cargar_matriz_y_solucion()
+    self.cargar_matriz()
+    self.mostrar_movimientos_minimos_gui()
     self.mostrar_laberinto_gui()
     self.mostrar_cronometro_gui()
+    self.iniciar_solucion()
     
     self.ventana.mainloop()
 
+  def mostrar_movimientos_minimos_gui(self):
+    """Muestra la etiqueta con la cantidad mínima de movimientos, que se completa
+       cuando la solución está lista
+    """
+    
+    self.lbl_movimientos_minimos = tk.Label(
+      self.frame,
+      text='Resolviendo laberinto...',
+      font=('Arial', 15, 'bold'),
+      bg='light sky blue',
+      fg='black'
+    )
+    self.lbl_movimientos_minimos.place(
+      x = 708, y = 560
+    )
+  
+  def actualizar_movimientos_minimos_gui(self):
+    """Muestra la cantidad mínima de movimientos para resolver el laberinto
+    """
+    
+    minimo = self.distancias[self.grafo.indice_inicial] if self.grafo.indice_inicial >= 0 else -1
+    self.lbl_movimientos_minimos.config(
+      text='Mínimo: {} movimientos'.format(minimo) if minimo >= 0 else 'Sin solución'
+    )
+
   def mostrar_sugerencias(self):
     """Muestra las sugerencias de la posición actual y las muestra en el laberinto
     """
-    sugerencias = self.cprolog.pedir_sugerencia(self.pos_actual)
+    sugerencias = self.sugerencias_por_distancia(self.pos_actual)
     
     if sugerencias == []:
       messagebox.showinfo(
@@ -119,6 +170,51 @@ class Juego:
     else:
       self.mostrar_sugerencias_gui(sugerencias)
   
+  def sugerencias_por_distancia(self, posicion):
+    """Obtiene los movimientos desde una posición que acercan a la posición final,
+       según el campo de distancias precalculado
+
+    Args:
+        posicion (tuple): Posicion a consultar la ayuda
+
+    Returns:
+        list<tuple>: posiciones vecinas con una distancia menor a la final
+    """
+    
+    indice = self.grafo.indice(posicion)
+    if indice < 0 or self.distancias[indice] <= 0:
+      return []
+    distancia = self.distancias[indice]
+    return [
+      self.grafo.posicion(k) for k in self.grafo.sucesores(indice)
+      if self.distancias[k] == distancia - 1
+    ]
+  
+  def puede_llegar_al_final(self, posicion):
+    """Indica si desde la posición todavía se puede llegar a la posición final
+
+    Args:
+        posicion (tuple): Posicion a consultar
+
+    Returns:
+        bool: True si la distancia a la posición final es finita
+    """
+    
+    indice = self.grafo.indice(posicion)
+    return indice >= 0 and self.distancias[indice] >= 0
+  
+  def esta_atrapado(self, posicion):
+    """Indica si desde la posición ya no se puede llegar a la posición final
+
+    Args:
+        posicion (tuple): Posicion a consultar
+
+    Returns:
+        bool: True si la posición está en una región sin salida
+    """
+    
+    return self.indice_alcanzabilidad.atrapado(self.grafo.indice(posicion))
+  
   def mostrar_sugerencias_gui(self, sugerencias):
     """Muestra la lista de sugerencia (tuplas) en el laberinto
 
@@ -141,23 +237,10 @@ class Juego:
     """Efectua un abandono del juego, se reinicia con la misma matriz
     """
     
-    dao = DaoPartidasJson()
     self.estado = "Abandonado"
-    partida = {
-      "jugador": self.nombre_usuario,
-      "matriz": self.ruta_matriz,
-      "estado": self.estado,
-      "movimientos": self.movimientos,
-      "tiempo": self.cronometro['text'],
-      "cantSugerencias": self.cant_sugerencias,
-      "fecha": datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-    }
-    
-    partidas = dao.obtener_partidas()
-    partidas.append(partida)
-    dao.guardar_partidas(partidas)
+    self.registrar_partida()
     
-    self.cprolog.cerrar_consultor()
+    self.detener_solucion()
     
     # Se destruye la ventana actual luego de crear un nuevo juego con los mismos parametros
     self.cronometro.after_cancel(self.actualizar_cronometro)
@@ -171,13 +254,13 @@ class Juego:
         nombre_usuario (string): nombre del usuario
         ruta_matriz (string): ruta de la matriz
     """
-    Juego(nombre_usuario, ruta_matriz)
+    Juego(nombre_usuario, ruta_matriz, self.motor)
   
   def verificar_posicion_actual(self):
     """Verifica si la posicion actual es parte de la solucion
     """
     
-    if self.cprolog.es_parte_solucion(self.pos_actual):
+    if self.puede_llegar_al_final(self.pos_actual):
       messagebox.showinfo(
         "Es parte de la solución",
         "La posición actual es parte de la solución"
@@ -228,17 +311,113 @@ class Juego:
       )
       self.cronometro.after(1000, self.actualizar_cronometro)
   
-  def cargar_matriz_y_solucion(self):
-    """Carga la matriz y la solución desde prolog
+  def cargar_matriz(self):
+    """Carga la matriz y su grafo, lo necesario para empezar a jugar. Los comparten el
+       motor de resolución y la solución, para no volver a leer el archivo.
     """
-    self.cprolog = Consultor()
-    self.matriz = self.cprolog.definir_valores_iniciales(self.ruta_matriz)
-    self.cprolog.solucionar()
-    self.solucion = self.cprolog.get_camino_solucion()
+    
+    self.matriz = leer_matriz(self.ruta_matriz)
+    self.grafo = GrafoDirigido(self.matriz)
     
     self.cant_fil = len(self.matriz)
     self.cant_col = len(self.matriz[0])
   
+  def iniciar_solucion(self):
+    """Obtiene la solución en un hilo aparte. Mientras tanto los botones que dependen
+       de ella quedan deshabilitados y la ventana revisa periódicamente la cola de resultados.
+    """
+    
+    self.definir_estado_botones_solucion(tk.DISABLED)
+    threading.Thread(target=self.resolver_en_segundo_plano, daemon=True).start()
+    self.id_revision = self.ventana.after(INTERVALO_REVISION, self.revisar_solucion)
+  
+  def resolver_en_segundo_plano(self):
+    """Carga la solución con el motor de resolución elegido (o desde la caché) y calcula
+       las distancias a la posición final. Se ejecuta fuera del hilo de la ventana, por lo
+       que no modifica la interfaz: envía el resultado por la cola de resultados.
+    """
+    
+    try:
+      # Si la matriz ya se resolvió antes (mismo contenido y motor), se omite el motor
+      clave = cache_soluciones.calcular_clave(self.ruta_matriz, configuracion_motor(self.motor))
+      entrada = cache_soluciones.obtener(clave)
+      if entrada is None:
+        consultor = crear_consultor(self.motor)
+        try:
+          consultor.definir_valores_iniciales(self.ruta_matriz, self.matriz, self.grafo)
+          entrada = crear_entrada(consultor, self.matriz, consultor.solucionar(), self.grafo)
+        finally:
+          # La sesión de Prolog se devuelve aunque la resolución falle
+          consultor.cerrar_consultor()
+        # Una resolución que agotó su límite no se guarda, para reintentarla la próxima vez
+        if entrada['limite'] is None:
+          cache_soluciones.guardar(clave, entrada)
+      
+      solucion = SolucionCacheada(entrada)
+      solucion.definir_valores_iniciales(self.ruta_matriz, self.matriz, self.grafo)
+      # Distancia de cada casilla a la posición final, para verificar y sugerir sin el motor
+      distancias = solucion.grafo.distancias_hacia(solucion.grafo.indice_final)
+      self.resultados_solucion.put((solucion, distancias, None))
+    except Exception as error:
+      self.resultados_solucion.put((None, None, error))
+  
+  def revisar_solucion(self):
+    """Revisa si la solución en segundo plano ya está lista; si no, vuelve a revisar
+       después de INTERVALO_REVISION milisegundos
+    """
+    
+    try:
+      solucion, distancias, error = self.resultados_solucion.get_nowait()
+    except queue.Empty:
+      self.id_revision = self.ventana.after(INTERVALO_REVISION, self.revisar_solucion)
+      return
+    self.id_revision = None
+    
+    if error is not None:
+      self.lbl_movimientos_minimos.config(text='Error al resolver')
+      messagebox.showerror(
+        'Error', 'No se pudo resolver el laberinto: {}'.format(error)
+      )
+      return
+    
+    self.cprolog = solucion
+    self.solucion = solucion.get_camino_solucion()
+    self.indice_alcanzabilidad = solucion.indice_alcanzabilidad
+    self.distancias = distancias
+    
+    self.actualizar_movimientos_minimos_gui()
+    self.definir_estado_botones_solucion(tk.NORMAL)
+    
+    if solucion.get_limite_alcanzado() is not None:
+      # Verificar y sugerir usan las distancias locales, que no dependen del motor
+      if not solucion.solucionar():
+        self.btn_mostrar_solucion.config(state=tk.DISABLED)
+      messagebox.showwarning(
+        'Tiempo agotado',
+        'El motor no terminó de resolver el laberinto dentro del límite ({}); '
+        'la solución disponible es parcial'.format(solucion.get_limite_alcanzado())
+      )
+  
+  def definir_estado_botones_solucion(self, estado):
+    """Habilita o deshabilita los botones que necesitan la solución
+
+    Args:
+        estado (string): tk.NORMAL o tk.DISABLED
+    """
+    
+    for boton in (self.btn_verificar, self.btn_sugerencia, self.btn_mostrar_solucion):
+      boton.config(state=estado)
+  
+  def detener_solucion(self):
+    """Deja de esperar la solución en segundo plano y cierra el consultor
+    """
+    
+    if self.id_revision is not None:
+      self.ventana.after_cancel(self.id_revision)
+      self.id_revision = None
+    if self.cprolog is not None:
+      self.cprolog.cerrar_consultor()
+  
   def mostrar_laberinto_gui(self):
     """Se muestra el laberinto en la ventana
     """
@@ -291,7 +470,7 @@ class Juego:
     self.estado = "AutoSolucionado"
     self.registrar_partida()
     
-    self.cprolog.cerrar_consultor()
+    self.detener_solucion()
     
     self.cronometro.after_cancel(self.actualizar_cronometro)
     
@@ -308,9 +487,7 @@ class Juego:
   def mostrar_posiciones_limitantes_gui(self):
     """Se muestra las posiciones limitantes en la ventana
     """
-    json_posiciones = self.cprolog.pthread.query('posicion_borrada(X)')
-    for obj in json_posiciones:
-      pos = (int(obj['X']['args'][0]), int(obj['X']['args'][1]))
+    for pos in self.cprolog.get_posiciones_borradas():
       self.btns_matriz[pos[0] * self.cant_col + pos[1]][2].config(
         bg='red'
       )
@@ -321,22 +498,13 @@ class Juego:
     Args:
         event (any): Evento de tecla presionada
     """
-    posicion_destino = (-1, -1)
-    if event.keysym == 'Up':
-      # Verificar que no se salga del laberinto
-      if self.pos_actual[0] - 1 >= 0:
-        posicion_destino = (self.pos_actual[0] - 1, self.pos_actual[1])
-    elif event.keysym == 'Down':
-      if self.pos_actual[0] + 1 < self.cant_fil:
-        posicion_destino = (self.pos_actual[0] + 1, self.pos_actual[1])
-    elif event.keysym == 'Left':
-      if self.pos_actual[1] - 1 >= 0:
-        posicion_destino = (self.pos_actual[0], self.pos_actual[1] - 1)
-    elif event.keysym == 'Right':
-      if self.pos_actual[1] + 1 < self.cant_col:
-        posicion_destino = (self.pos_actual[0], self.pos_actual[1] + 1)
-    
-    if (self.cprolog.es_movimiento_valido(self.pos_actual, posicion_destino)):
+    movimiento = TECLAS_MOVIMIENTO.get(event.keysym)
+    
+    if movimiento is None:
+      return
+    posicion_destino = reglas.obtener_nueva_posicion(self.pos_actual, movimiento)
+    # La validación es local (sin consultar al motor) sobre el grafo, igual a es_movimiento_valido/2
+    if self.grafo.es_arista(self.grafo.indice(self.pos_actual), self.grafo.indice(posicion_destino)):
       # Pintando posición anterior
       if (self.pos_actual != self.pos_ini):
         self.btns_matriz[self.pos_actual[0] * self.cant_col + self.pos_actual[1]][2].config(
@@ -347,14 +515,21 @@ class Juego:
         bg='green4'
       )
       self.movimientos.append(posicion_destino)
+      posicion_anterior = self.pos_actual
       self.pos_actual = posicion_destino
+      
+      if (self.indice_alcanzabilidad is not None and
+          self.esta_atrapado(posicion_destino) and not self.esta_atrapado(posicion_anterior)):
+        messagebox.showwarning(
+          'Advertencia', 'Desde esta posición ya no es posible llegar a la salida'
+        )
       if (posicion_destino == self.pos_fin):
         messagebox.showinfo(
           'Mensaje', '¡Felicidades, has completado el laberinto!'
         )
         self.estado = "Exitoso"
         self.registrar_partida()
-        self.cprolog.cerrar_consultor()
+        self.detener_solucion()
         
         self.ventana.after(
           1050,
@@ -366,7 +541,7 @@ class Juego:
     """Registra la partida en el archivo
     """
     
-    dao = DaoPartidasJson()
+    dao = crear_dao()
     
     partida = {
       "jugador": self.nombre_usuario,
@@ -378,8 +553,7 @@ class Juego:
       "fecha": datetime.now().strftime("%d/%m/%Y %H:%M:%S")
     }
     
-    partidas = dao.obtener_partidas()
-    partidas.append(partida)
-    dao.guardar_partidas(partidas)
+    # Solo se agrega la partida nueva, sin leer ni reescribir el historial
+    dao.agregar_partida(partida)
     
     
\ No newline at end of file
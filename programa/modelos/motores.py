@@ -0,0 +1,74 @@
+'''
+Módulo: motores.py
+Descripción: selección del motor de resolución del laberinto (Prolog o Python nativo)
+'''
+
+MOTOR_PROLOG = 'prolog'
+MOTOR_PYTHON = 'python'
+
+# Motor utilizado cuando no se indica uno de forma explícita
+MOTOR_PREDETERMINADO = MOTOR_PROLOG
+
+def crear_consultor(motor = MOTOR_PREDETERMINADO, **opciones):
+  """Crea el consultor correspondiente al motor indicado
+
+  Args:
+      motor (string): MOTOR_PROLOG o MOTOR_PYTHON
+      opciones (dict): Argumentos para el constructor del motor nativo (modo, k)
+
+  Returns:
+      Consultor | Solucionador: objeto con la interfaz de consultas del laberinto
+  """
+
+  if motor == MOTOR_PYTHON:
+    from modelos.solucionador import Solucionador
+    return Solucionador(**opciones)
+  elif motor == MOTOR_PROLOG:
+    # Las sesiones de Prolog se toman del pool; cerrar_consultor las devuelve
+    from modelos.pool_consultores import pool_consultores
+    return pool_consultores.obtener()
+  raise ValueError('Motor de resolución desconocido: {}'.format(motor))
+
+def configuracion_motor(motor = MOTOR_PREDETERMINADO, **opciones):
+  """Obtiene la configuración de resolución (con los valores predeterminados) del consultor
+     que crearía crear_consultor con los mismos argumentos, sin crearlo. Soluciones de
+     configuraciones distintas pueden diferir, por lo que forma parte de la clave de la caché.
+
+  Args:
+      motor (string): MOTOR_PROLOG o MOTOR_PYTHON
+      opciones (dict): Argumentos para el constructor del motor nativo (modo, k, límites)
+
+  Returns:
+      dict: motor y parámetros que afectan la solución
+  """
+
+  if motor == MOTOR_PYTHON:
+    from modelos import solucionador
+    return {
+      'motor': motor,
+      'modo': opciones.get('modo', solucionador.MODO_EXPLORACION),
+      'k': opciones.get('k', solucionador.K_PREDETERMINADO),
+      'limite_pasos': opciones.get('limite_pasos', solucionador.LIMITE_PASOS),
+      'limite_tiempo': opciones.get('limite_tiempo', solucionador.LIMITE_TIEMPO)
+    }
+  elif motor == MOTOR_PROLOG:
+    # El pool crea los consultores con los valores predeterminados
+    from modelos import consultor
+    return {
+      'motor': motor,
+      'hilos': consultor.HILOS_CRUCES,
+      'limite_inferencias': consultor.LIMITE_INFERENCIAS,
+      'limite_tiempo': consultor.LIMITE_TIEMPO
+    }
+  raise ValueError('Motor de resolución desconocido: {}'.format(motor))
+
+def precalentar_motor(motor = MOTOR_PREDETERMINADO):
+  """Inicia de antemano los recursos del motor, para que el primer juego no espere
+
+  Args:
+      motor (string): MOTOR_PROLOG o MOTOR_PYTHON
+  """
+
+  if motor == MOTOR_PROLOG:
+    from modelos.pool_consultores import pool_consultores
+    pool_consultores.precalentar()
@@ -0,0 +1,29 @@
+'''
+Módulo: persistencia.py
+Descripción: selección del almacenamiento de partidas (archivo JSON o base de datos SQLite)
+'''
+
+PERSISTENCIA_JSON = 'json'
+PERSISTENCIA_SQLITE = 'sqlite'
+
+# Almacenamiento utilizado cuando no se indica uno de forma explícita
+PERSISTENCIA_PREDETERMINADA = PERSISTENCIA_JSON
+
+def crear_dao(tipo = PERSISTENCIA_PREDETERMINADA, **opciones):
+  """Crea el dao de partidas correspondiente al almacenamiento indicado
+
+  Args:
+      tipo (string): PERSISTENCIA_JSON o PERSISTENCIA_SQLITE
+      opciones (dict): Argumentos para el constructor del dao (formato, path)
+
+  Returns:
+      DaoPartidasJson | DaoPartidasSqlite: objeto con la interfaz de partidas
+  """
+
+  if tipo == PERSISTENCIA_JSON:
+    from modelos.dao_partidas_json import DaoPartidasJson
+    return DaoPartidasJson(**opciones)
+  elif tipo == PERSISTENCIA_SQLITE:
+    from modelos.dao_partidas_sqlite import DaoPartidasSqlite
+    return DaoPartidasSqlite(**opciones)
+  raise ValueError('Almacenamiento de partidas desconocido: {}'.format(tipo))
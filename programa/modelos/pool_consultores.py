@@ -0,0 +1,164 @@
+'''
+Módulo: pool_consultores.py
+Clase: PoolConsultores
+Descripción: pool de sesiones de Prolog iniciadas y con logica.pl consultado, listas para prestarse
+'''
+import atexit
+import threading
+import time
+
+from modelos.consultor import Consultor, HILOS_CRUCES
+
+# Cantidad de sesiones inactivas que se mantienen y segundos que puede estar inactiva cada una.
+# Una resolución usa su propia sesión y HILOS_CRUCES sesiones más para explorar los cruces:
+# con menos sesiones en el pool, cada resolución iniciaría y detendría procesos swipl.
+TAMANO_POOL = max(2, HILOS_CRUCES + 1)
+TIEMPO_INACTIVO = 300
+
+class PoolConsultores:
+  """Mantiene sesiones de Prolog precalentadas para evitar iniciar un proceso
+     swipl por cada juego, reinicio o repetición
+  """
+
+  def __init__(self, tamano = TAMANO_POOL, tiempo_inactivo = TIEMPO_INACTIVO):
+    """Constructor
+
+    Args:
+        tamano (int): Cantidad máxima de sesiones inactivas en el pool
+        tiempo_inactivo (float): Segundos tras los cuales se cierra una sesión sin usar
+    """
+
+    self.tamano = tamano
+    self.tiempo_inactivo = tiempo_inactivo
+    self.inactivos = [] # Lista de (consultor, momento en que fue devuelto)
+    self.candado = threading.Lock()
+    self.temporizador = None
+
+  def crear_consultor(self):
+    """Inicia una nueva sesión de Prolog perteneciente al pool
+
+    Returns:
+        Consultor: sesión con logica.pl consultado
+    """
+
+    consultor = Consultor()
+    consultor.pool = self
+    return consultor
+
+  def ampliar(self, tamano):
+    """Aumenta la cantidad de sesiones inactivas que se mantienen, por ejemplo para un
+       consultor que explora los cruces con más sesiones que HILOS_CRUCES
+
+    Args:
+        tamano (int): Cantidad mínima de sesiones inactivas en el pool
+    """
+
+    with self.candado:
+      self.tamano = max(self.tamano, tamano)
+
+  def precalentar(self):
+    """Inicia en segundo plano las sesiones que faltan para llenar el pool
+    """
+
+    def llenar():
+      with self.candado:
+        faltantes = self.tamano - len(self.inactivos)
+      for _ in range(0, faltantes):
+        consultor = self.crear_consultor()
+        with self.candado:
+          self.inactivos.append((consultor, time.monotonic()))
+      self.programar_limpieza()
+
+    threading.Thread(target=llenar, daemon=True).start()
+
+  def obtener(self):
+    """Presta una sesión del pool, o inicia una nueva si no hay sesiones inactivas
+
+    Returns:
+        Consultor: sesión lista para cargar un laberinto
+    """
+
+    self.limpiar_inactivos()
+    with self.candado:
+      if self.inactivos:
+        return self.inactivos.pop()[0]
+    return self.crear_consultor()
+
+  def devolver(self, consultor):
+    """Recibe una sesión prestada, la reinicia y la deja disponible.
+       Si el pool está lleno o la sesión falla al reiniciarse, se detiene.
+
+    Args:
+        consultor (Consultor): sesión prestada por el pool
+    """
+
+    try:
+      consultor.reiniciar()
+    except Exception:
+      self.detener(consultor)
+      return
+
+    with self.candado:
+      if len(self.inactivos) < self.tamano:
+        self.inactivos.append((consultor, time.monotonic()))
+        consultor = None
+    if consultor is not None:
+      self.detener(consultor)
+    self.programar_limpieza()
+
+  def limpiar_inactivos(self):
+    """Detiene las sesiones que superaron el tiempo de inactividad
+    """
+
+    limite = time.monotonic() - self.tiempo_inactivo
+    with self.candado:
+      vencidos = [c for c, devuelto in self.inactivos if devuelto <= limite]
+      self.inactivos = [(c, devuelto) for c, devuelto in self.inactivos if devuelto > limite]
+    for consultor in vencidos:
+      self.detener(consultor)
+
+  def programar_limpieza(self):
+    """Programa la limpieza de sesiones inactivas mientras existan
+    """
+
+    with self.candado:
+      if self.temporizador is not None or not self.inactivos:
+        return
+      self.temporizador = threading.Timer(self.tiempo_inactivo, self.ejecutar_limpieza)
+      self.temporizador.daemon = True
+      self.temporizador.start()
+
+  def ejecutar_limpieza(self):
+    """Limpieza periódica ejecutada por el temporizador
+    """
+
+    with self.candado:
+      self.temporizador = None
+    self.limpiar_inactivos()
+    self.programar_limpieza()
+
+  def detener(self, consultor):
+    """Detiene el proceso de Prolog de una sesión, ignorando errores de conexión
+    """
+
+    try:
+      consultor.detener()
+    except Exception:
+      pass
+
+  def cerrar(self):
+    """Detiene todas las sesiones inactivas del pool
+    """
+
+    with self.candado:
+      inactivos = self.inactivos
+      self.inactivos = []
+      if self.temporizador is not None:
+        self.temporizador.cancel()
+        self.temporizador = None
+    for consultor, _ in inactivos:
+      self.detener(consultor)
+
+# Pool compartido por toda la aplicación
+pool_consultores = PoolConsultores()
+atexit.register(pool_consultores.cerrar)
@@ -0,0 +1,53 @@
+'''
+Módulo: reglas.py
+Descripción: reglas de movimiento del laberinto dirigido, equivalentes a las definidas en logica.pl
+'''
+
+# Movimientos permitidos según el valor de la casilla (obtener_movimientos_de_valor/2)
+MOVIMIENTOS_POR_VALOR = {
+  'i': ('arriba', 'derecha', 'abajo', 'izquierda'),
+  'c': ('arriba', 'derecha', 'abajo', 'izquierda'),
+  'u': ('arriba',),
+  'd': ('abajo',),
+  'l': ('izquierda',),
+  'r': ('derecha',)
+}
+
+# Desplazamiento (fila, columna) de cada movimiento (obtener_nueva_posicion/3)
+DESPLAZAMIENTOS = {
+  'arriba': (-1, 0),
+  'abajo': (1, 0),
+  'izquierda': (0, -1),
+  'derecha': (0, 1)
+}
+
+PARED = 'x'
+INICIO = 'i'
+FINAL = 'f'
+CRUCE = 'c'
+
+def obtener_movimientos_de_valor(valor):
+  """Retorna los movimientos permitidos para el valor de una casilla
+
+  Args:
+      valor (string): Valor de la casilla
+
+  Returns:
+      tuple<string>: Movimientos permitidos, vacío si no tiene movimientos
+  """
+
+  return MOVIMIENTOS_POR_VALOR.get(valor, ())
+
+def obtener_nueva_posicion(posicion, movimiento):
+  """Calcula la posición resultante de aplicar un movimiento
+
+  Args:
+      posicion (tuple): Posición de origen
+      movimiento (string): Movimiento a aplicar
+
+  Returns:
+      tuple: Posición destino
+  """
+
+  desp = DESPLAZAMIENTOS[movimiento]
+  return (posicion[0] + desp[0], posicion[1] + desp[1])
@@ -0,0 +1,544 @@
+'''
+Módulo: solucionador.py
+Clase: Solucionador
+Descripción: motor de resolución nativo (sin Prolog) con la misma interfaz que Consultor
+'''
+import time
+from array import array
+
+from modelos import reglas
+from modelos.cargador_matriz import leer_matriz, filas_texto
+from modelos.grafo import GrafoDirigido
+from modelos import caminos_minimos
+
+# Modos de resolución
+MODO_EXPLORACION = 'exploracion' # Búsqueda en profundidad y caminos desde cruces pendientes (como logica.pl)
+MODO_MINIMO = 'minimo' # Un solo camino de longitud mínima
+MODO_TODOS_MINIMOS = 'todos_minimos' # Unión de todos los caminos de longitud mínima
+MODO_K_MINIMOS = 'k_minimos' # Los k caminos simples más cortos (no lineal)
+# Modos de costo lineal, que se pueden resolver en segundo plano y guardar en la caché
+MODOS_PRECALCULABLES = (MODO_EXPLORACION, MODO_MINIMO, MODO_TODOS_MINIMOS)
+K_PREDETERMINADO = 3 # Cantidad de caminos de MODO_K_MINIMOS
+
+# Límites de cada resolución (equivalentes a los de Consultor). None desactiva el límite.
+LIMITE_PASOS = None # Casillas procesadas por las búsquedas en profundidad
+LIMITE_TIEMPO = 20 # segundos
+
+# Cada cuántos pasos se revisa el límite de tiempo
+PASOS_ENTRE_REVISIONES = 1024
+
+class LimiteAlcanzado(Exception):
+  """Se lanza dentro de la resolución al agotar un límite; tipo es 'pasos' o 'tiempo'
+  """
+
+  def __init__(self, tipo):
+    super().__init__(tipo)
+    self.tipo = tipo
+
+class Solucionador:
+  """Resuelve el laberinto dirigido dentro del proceso de Python, siguiendo
+     las reglas de movimiento de logica.pl. Expone la misma interfaz que Consultor
+     para poder usarse como reemplazo directo.
+  """
+
+  def __init__(self, modo = MODO_EXPLORACION, k = K_PREDETERMINADO, limite_pasos = LIMITE_PASOS,
+               limite_tiempo = LIMITE_TIEMPO):
+    """Constructor principal
+
+    Args:
+        modo (string): Modo de resolución (MODO_EXPLORACION, MODO_MINIMO,
+                       MODO_TODOS_MINIMOS o MODO_K_MINIMOS)
+        k (int): Cantidad de caminos para MODO_K_MINIMOS
+        limite_pasos (int): Casillas máximas a procesar en la exploración, None sin límite
+        limite_tiempo (float): Segundos máximos de la resolución, None sin límite
+    """
+
+    self.modo = modo
+    self.k = k
+    self.limite_pasos = limite_pasos
+    self.limite_tiempo = limite_tiempo
+    self.matriz = []
+    self.cant_fil = 0
+    self.cant_col = 0
+    self.paredes = []
+    self.posicion_inicial = None
+    self.posicion_final = None
+    self.grafo = GrafoDirigido(self.matriz)
+    self.reiniciar_solucion()
+
+  def reiniciar_solucion(self):
+    """Elimina el estado de la última resolución
+    """
+
+    self.camino_solucion = []
+    self.celdas_solucion = bytearray(self.grafo.cant_celdas)
+    self.cruces_pendientes = []
+    self.posiciones_borradas = []
+    self.longitudes = []
+    self.limite_alcanzado = None
+    self.visitadas_parciales = []
+    self.pasos = 0
+    self.fin_plazo = None
+
+  def cerrar_consultor(self):
+    """No mantiene conexiones externas, existe por compatibilidad con Consultor
+    """
+
+    self.reiniciar_solucion()
+
+  def definir_valores_iniciales(self, path, matriz = None, grafo = None):
+    """Define la matriz, las posiciones iniciales y finales de la matriz
+
+    Args:
+        path (string): La ruta de la matriz para cargar
+        matriz (MatrizCompacta): La matriz ya leída, para no volver a leer el archivo (opcional)
+        grafo (GrafoDirigido): El grafo ya compilado de esa matriz (opcional)
+
+    Returns:
+        MatrizCompacta: La matriz con los valores de cada casilla
+    """
+
+    if matriz is None:
+      matriz = self.cargar_matriz(path)
+    else:
+      self.usar_matriz(matriz)
+    self.set_posiciones_inic(matriz, grafo)
+    return matriz
+
+  def cargar_matriz(self, path):
+    """Lee la matriz desde el archivo, relativo al directorio del programa
+
+    Args:
+        path (string): Ruta del archivo con la matriz
+
+    Returns:
+        MatrizCompacta: Matriz con los valores de cada casilla, un byte por casilla
+    """
+
+    self.usar_matriz(leer_matriz(path))
+    return self.matriz
+
+  def usar_matriz(self, matriz):
+    """Define la matriz a resolver y sus dimensiones
+
+    Args:
+        matriz (MatrizCompacta | list<list>): Matriz con los valores de cada casilla
+    """
+
+    self.matriz = matriz
+    self.cant_fil = len(self.matriz)
+    self.cant_col = len(self.matriz[0]) if self.cant_fil > 0 else 0
+
+  def set_posiciones_inic(self, matriz, grafo = None):
+    """Compila el grafo de la matriz (si no se recibe ya compilado) y define las posiciones
+       de inicio y de fin. Las paredes se calculan solo si se consultan.
+    """
+
+    self.grafo = grafo if grafo is not None else GrafoDirigido(matriz)
+    self.paredes = None
+    self.posicion_inicial = None
+    self.posicion_final = None
+    if self.grafo.indice_inicial >= 0:
+      self.posicion_inicial = self.grafo.posicion(self.grafo.indice_inicial)
+    if self.grafo.indice_final >= 0:
+      self.posicion_final = self.grafo.posicion(self.grafo.indice_final)
+    self.reiniciar_solucion()
+
+  # ========== [ Consultas ] ==========
+
+  def get_posiciones_paredes(self):
+    """Obtiene las posiciones de las paredes del laberinto
+
+    Returns:
+        list<tuple>: Lista de tuplas con las posiciones de las paredes
+    """
+
+    if self.paredes is None:
+      self.paredes = [
+        (fil, col)
+        for fil, fila in enumerate(filas_texto(self.matriz))
+        for col, valor in enumerate(fila) if valor == reglas.PARED
+      ]
+    return list(self.paredes)
+
+  def get_posicion_inicial(self):
+    """Obtiene la posición inicial del laberinto en forma de tupla
+
+    Returns:
+        tuple: posicion inicial del laberinto
+    """
+
+    return self.posicion_inicial
+
+  def get_posicion_final(self):
+    """Regresa la posición final del laberinto en forma de tupla
+
+    Returns:
+        tuple: posicion final o meta del laberinto
+    """
+
+    return self.posicion_final
+
+  def get_cruces_pendientes(self):
+    """Retorna la lista de cruces pendientes que quedan por visitar
+
+    Returns:
+        list<tuple>: lista con las posiciones de los cruces pendientes
+    """
+
+    return list(self.cruces_pendientes)
+
+  def get_valor_posicion(self, posicion):
+    """Obtiene el valor de la posición indicada
+
+    Args:
+        posicion (tuple): Posicion a consultar
+
+    Returns:
+        string: Valor de la posición, None si está fuera de la matriz
+    """
+
+    fil, col = posicion
+    if (0 <= fil < self.cant_fil and 0 <= col < len(self.matriz[fil])):
+      return self.matriz[fil][col]
+    return None
+
+  def get_posiciones_borradas(self):
+    """Retorna las posiciones visitadas que fueron descartadas del camino solución
+
+    Returns:
+        list<tuple>: lista de posiciones borradas
+    """
+
+    return list(self.posiciones_borradas)
+
+  # ========== [ Logica (Solucion) ] ==========
+
+  def obtener_movimientos(self, posicion):
+    """Obtiene las posiciones alcanzables con un movimiento desde una posición
+
+    Args:
+        posicion (tuple): Posición de origen
+
+    Returns:
+        list<tuple>: Posiciones destino viables
+    """
+
+    indice = self.grafo.indice(posicion)
+    if indice < 0:
+      return []
+    return [self.grafo.posicion(k) for k in self.grafo.sucesores(indice)]
+
+  def buscar_camino(self, origen):
+    """Búsqueda en profundidad sobre el grafo desde el origen hasta la posición final,
+       registrando el padre de cada casilla visitada
+
+    Args:
+        origen (int): Índice de la casilla donde inicia la búsqueda
+
+    Returns:
+        tuple: (camino, visitadas) como listas de índices,
+               camino es None si no se llega a la posición final
+    """
+
+    grafo = self.grafo
+    desplazamientos = grafo.desplazamientos
+    destinos = grafo.destinos
+    final = grafo.indice(self.posicion_final)
+
+    padres = array('i', [-1]) * grafo.cant_celdas
+    visitada = bytearray(grafo.cant_celdas)
+    visitada[origen] = 1
+    visitadas = [origen]
+    # Si se agota un límite, las casillas exploradas hasta ese momento quedan disponibles
+    self.visitadas_parciales = visitadas
+    pila = [origen]
+    pasos = self.pasos
+    revision = self.siguiente_revision(pasos)
+    while pila:
+      pasos += 1
+      if pasos >= revision:
+        self.pasos = pasos
+        revision = self.siguiente_revision(pasos)
+      actual = pila.pop()
+      if actual == final:
+        camino = []
+        while actual != -1:
+          camino.append(actual)
+          actual = padres[actual]
+        camino.reverse()
+        self.pasos = pasos
+        return camino, visitadas
+      for k in range(desplazamientos[actual + 1] - 1, desplazamientos[actual] - 1, -1):
+        destino = destinos[k]
+        if not visitada[destino]:
+          visitada[destino] = 1
+          padres[destino] = actual
+          visitadas.append(destino)
+          pila.append(destino)
+    self.pasos = pasos
+    return None, visitadas
+
+  def siguiente_revision(self, pasos):
+    """Revisa los límites de la resolución y calcula en qué paso se deben volver a revisar
+
+    Args:
+        pasos (int): Pasos realizados hasta el momento
+
+    Returns:
+        int: Paso de la siguiente revisión
+
+    Raises:
+        LimiteAlcanzado: si se agotó el límite de pasos o de tiempo
+    """
+
+    if self.limite_pasos is not None and pasos >= self.limite_pasos:
+      raise LimiteAlcanzado('pasos')
+    if self.fin_plazo is not None and time.monotonic() >= self.fin_plazo:
+      raise LimiteAlcanzado('tiempo')
+    revision = pasos + PASOS_ENTRE_REVISIONES
+    if self.limite_pasos is not None:
+      revision = min(revision, self.limite_pasos)
+    return revision
+
+  def solucionar(self):
+    """Función principal que resuelve el laberinto según el modo elegido
+
+    Returns:
+        boolean: True si se encontró una solución, False si no
+    """
+
+    self.reiniciar_solucion()
+    if self.posicion_inicial is None or self.posicion_final is None:
+      return False
+    if self.limite_tiempo is not None:
+      self.fin_plazo = time.monotonic() + self.limite_tiempo
+
+    try:
+      if self.modo == MODO_EXPLORACION:
+        return self.solucionar_exploracion()
+      return self.solucionar_minimos()
+    except LimiteAlcanzado as limite:
+      # Se conserva lo resuelto: con camino solución faltan solo caminos desde cruces
+      # (o los siguientes k caminos); sin él, las casillas exploradas quedan como posiciones borradas
+      self.limite_alcanzado = limite.tipo
+      if self.camino_solucion:
+        return True
+      self.posiciones_borradas = [self.grafo.posicion(k) for k in self.visitadas_parciales]
+      return False
+
+  def contar_pasos(self, cantidad):
+    """Suma las casillas procesadas por una búsqueda en anchura y revisa los límites
+
+    Args:
+        cantidad (int): Casillas procesadas
+
+    Raises:
+        LimiteAlcanzado: si se agotó el límite de pasos o de tiempo
+    """
+
+    self.pasos += cantidad
+    self.siguiente_revision(self.pasos)
+
+  def get_limite_alcanzado(self):
+    """Indica si la última resolución se detuvo por alcanzar un límite
+
+    Returns:
+        string: 'pasos' o 'tiempo', None si terminó completa
+    """
+
+    return self.limite_alcanzado
+
+  def solucionar_minimos(self):
+    """Resuelve con caminos de longitud mínima (MODO_MINIMO, MODO_TODOS_MINIMOS, MODO_K_MINIMOS),
+       con los mismos límites que la exploración.
+       Las posiciones borradas son las alcanzables desde el inicio que ya no llegan al final.
+
+    Returns:
+        boolean: True si se encontró una solución, False si no
+    """
+
+    origen = self.grafo.indice(self.posicion_inicial)
+    destino = self.grafo.indice(self.posicion_final)
+
+    if self.modo == MODO_MINIMO:
+      camino = caminos_minimos.camino_minimo(self.grafo, origen, destino, revisar=self.contar_pasos)
+      caminos = [camino] if camino is not None else []
+    elif self.modo == MODO_TODOS_MINIMOS:
+      celdas, longitud = caminos_minimos.celdas_caminos_minimos(self.grafo, origen, destino)
+      self.contar_pasos(self.grafo.cant_celdas)
+      caminos = [celdas] if celdas else []
+    elif self.modo == MODO_K_MINIMOS:
+      caminos = caminos_minimos.k_caminos_minimos(
+        self.grafo, origen, destino, self.k, revisar=self.contar_pasos
+      )
+    else:
+      raise ValueError('Modo de resolución desconocido: {}'.format(self.modo))
+
+    # Los caminos se agregan a medida que se encuentran, para conservarlos si se agota un límite
+    for camino in caminos:
+      if not self.camino_solucion:
+        self.calcular_posiciones_borradas(origen, destino)
+      self.agregar_camino_solucion(camino)
+      self.longitudes.append(longitud if self.modo == MODO_TODOS_MINIMOS else len(camino) - 1)
+    return bool(self.camino_solucion)
+
+  def calcular_posiciones_borradas(self, origen, destino):
+    """Posiciones alcanzables desde el inicio que no llegan al final
+
+    Args:
+        origen (int): Índice de la posición inicial
+        destino (int): Índice de la posición final
+    """
+
+    desde = self.grafo.distancias_desde(origen)
+    hacia = self.grafo.distancias_hacia(destino)
+    self.posiciones_borradas = [
+      self.grafo.posicion(k) for k in range(0, self.grafo.cant_celdas)
+      if desde[k] >= 0 and hacia[k] < 0
+    ]
+
+  def solucionar_exploracion(self):
+    """Resuelve como logica.pl: búsqueda en profundidad desde el inicio y luego
+       caminos desde cada cruce pendiente. Igual que determinar_cruces_pendientes/0, los
+       cruces pendientes son los cruces del camino solución (las posiciones visitadas ya
+       podadas), y desde cada uno se agrega otro camino hacia la posición final.
+
+    Returns:
+        boolean: True si se encontró una solución, False si no
+    """
+
+    camino, visitadas = self.buscar_camino(self.grafo.indice(self.posicion_inicial))
+    if camino is None:
+      return False
+
+    self.agregar_camino_solucion(camino)
+    self.longitudes = [len(camino) - 1]
+    posicion = self.grafo.posicion
+    self.posiciones_borradas = [
+      posicion(k) for k in visitadas if not self.celdas_solucion[k]
+    ]
+    self.cruces_pendientes = [
+      posicion(k) for k in camino if self.get_valor_posicion(posicion(k)) == reglas.CRUCE
+    ]
+    self.encontrar_otros_caminos(self.cruces_pendientes)
+    return True
+
+  def agregar_camino_solucion(self, camino):
+    """Agrega las casillas de un camino al camino solución, sin duplicados
+
+    Args:
+        camino (list<int>): índices de las casillas del camino
+    """
+
+    for k in camino:
+      if not self.celdas_solucion[k]:
+        self.celdas_solucion[k] = 1
+        self.camino_solucion.append(self.grafo.posicion(k))
+
+  def encontrar_otros_caminos(self, lista_cruces):
+    """Agrega al camino solución otro camino hacia la posición final desde cada cruce pendiente,
+       que sale por una casilla fuera del camino solución.
+       En lugar de una búsqueda en profundidad por cruce (que recorre la matriz completa cada vez
+       y vuelve a encontrar el mismo camino), se calcula una sola vez la distancia de cada casilla
+       hasta el final y desde cada cruce se avanza por casillas cada vez más cercanas hasta unirse
+       al camino solución. Cada casilla se agrega una sola vez, el recorrido total es lineal.
+
+    Args:
+        lista_cruces (list<tuple>): lista de cruces a recorrer
+    """
+
+    grafo = self.grafo
+    desplazamientos = grafo.desplazamientos
+    destinos = grafo.destinos
+    celdas_solucion = self.celdas_solucion
+    hacia = grafo.distancias_hacia(grafo.indice(self.posicion_final))
+
+    for cruce in lista_cruces:
+      indice = grafo.indice(cruce)
+      salida = next((
+        destinos[k] for k in range(desplazamientos[indice], desplazamientos[indice + 1])
+        if not celdas_solucion[destinos[k]] and hacia[destinos[k]] >= 0
+      ), None)
+      if salida is None:
+        continue
+
+      # Cada paso baja la distancia en uno, hasta una casilla del camino solución
+      # (a más tardar, la posición final)
+      camino = [salida]
+      actual = salida
+      while not celdas_solucion[actual]:
+        distancia = hacia[actual] - 1
+        actual = next(
+          destinos[k] for k in range(desplazamientos[actual], desplazamientos[actual + 1])
+          if hacia[destinos[k]] == distancia
+        )
+        camino.append(actual)
+      self.agregar_camino_solucion(camino)
+
+  def get_longitudes_caminos(self):
+    """Retorna la cantidad de movimientos de cada camino encontrado.
+       En los modos de caminos mínimos el primero es la cantidad mínima de movimientos.
+
+    Returns:
+        list<int>: longitudes de los caminos
+    """
+
+    return list(self.longitudes)
+
+  def get_camino_solucion(self):
+    """Retorna el camino solución en forma de lista de tuplas
+
+    Returns:
+        list<tuple>: lista de tuplas con las posiciones del camino solución
+    """
+
+    return list(self.camino_solucion)
+
+  def es_parte_solucion(self, posicion):
+    """Consulta si la posición indicada es parte del camino solución
+
+    Args:
+        posicion (tuple): Posicion a consultar
+
+    Returns:
+        bool: True si es parte del camino solución, False si no
+    """
+
+    indice = self.grafo.indice(posicion)
+    return indice >= 0 and bool(self.celdas_solucion[indice])
+
+  def pedir_sugerencia(self, posicion):
+    """Solicita una sugerencia de movimiento de una posición en específico.
+
+    Args:
+        posicion (tuple): Posicion a consultar la ayuda
+
+    Returns:
+        list<tuple>: Lista de tuplas con las posiciones sugeridas
+        []: si no hay sugerencias
+    """
+
+    indice = self.grafo.indice(posicion)
+    if indice < 0:
+      return []
+    return [
+      self.grafo.posicion(k) for k in self.grafo.sucesores(indice)
+      if self.celdas_solucion[k]
+    ]
+
+  def es_movimiento_valido(self, posicion_inicial, posicion_destino):
+    """Verifica que una posicion destino sea un movimiento valido de una posicion inicial
+
+    Args:
+        posicion_inicial (tuple): Posicion inicial de la matriz
+        posicion_destino (tuple): Posicion destino de la matriz
+
+    Returns:
+        bool: True, si la posicion destino es un movimiento valido y directo de la posicion inicial
+    """
+
+    return self.grafo.es_arista(
+      self.grafo.indice(posicion_inicial),
+      self.grafo.indice(posicion_destino)
+    )
@@ -0,0 +1,76 @@
+'''
+Módulo: test_cargador_matriz.py
+Descripción: pruebas de la lectura de matrices con fin de línea CRLF, con el cargador de Python
+             (cargador_matriz.py) y con el de Prolog (cargar_laberinto/2 de logica.pl)
+
+Uso (desde la raíz del repositorio):
+  python -m unittest discover -s programa/pruebas
+'''
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+RAIZ_PROGRAMA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ_PROGRAMA)
+
+from modelos.cargador_matriz import leer_matriz, filas_texto
+from modelos.solucionador import Solucionador
+
+# El archivo se escribe en la prueba: con '* text=auto' git convertiría los CRLF de un archivo guardado
+FILAS = ['icx', 'xcf', 'xxx']
+CAMINO = {(0, 0), (0, 1), (1, 1), (1, 2)}
+
+class PruebaMatrizCRLF(unittest.TestCase):
+
+  def setUp(self):
+    self.carpeta = tempfile.mkdtemp()
+    self.rutas = {}
+    for nombre, fin_linea in [('lf', b'\n'), ('crlf', b'\r\n')]:
+      ruta = os.path.join(self.carpeta, nombre + '.txt')
+      with open(ruta, 'wb') as file:
+        file.write(fin_linea.join(fila.encode('ascii') for fila in FILAS) + fin_linea)
+      self.rutas[nombre] = ruta
+
+  def tearDown(self):
+    shutil.rmtree(self.carpeta)
+
+  def test_python_ignora_retorno_de_carro(self):
+    for nombre, ruta in self.rutas.items():
+      matriz = leer_matriz(ruta)
+      self.assertEqual(list(filas_texto(matriz)), FILAS, nombre)
+      self.assertEqual([len(fila) for fila in matriz], [3, 3, 3], nombre)
+      self.assertIsNone(matriz.valor(0, 3), nombre)
+
+  def test_solucionador_no_sale_de_la_matriz(self):
+    for nombre, ruta in self.rutas.items():
+      solucionador = Solucionador()
+      solucionador.definir_valores_iniciales(ruta)
+      self.assertTrue(solucionador.solucionar(), nombre)
+      self.assertEqual(set(solucionador.get_camino_solucion()), CAMINO, nombre)
+
+  @unittest.skipIf(shutil.which('swipl') is None, 'SWI-Prolog no está instalado')
+  def test_prolog_ignora_retorno_de_carro(self):
+    from modelos.consultor import Consultor
+
+    # Consultor ubica logica.pl relativo al directorio de trabajo (la raíz del repositorio)
+    directorio = os.getcwd()
+    os.chdir(os.path.dirname(RAIZ_PROGRAMA))
+    try:
+      consultor = Consultor(hilos=1)
+      try:
+        for nombre, ruta in self.rutas.items():
+          resumen = consultor.cargar_laberinto(ruta.replace('\\', '/'))
+          self.assertEqual((resumen['filas'], resumen['columnas']), (3, 3), nombre)
+          self.assertTrue(consultor.solucionar(), nombre)
+          self.assertEqual(set(consultor.get_camino_solucion()), CAMINO, nombre)
+          for fila, columna in consultor.get_posiciones_borradas():
+            self.assertLess(columna, 3, nombre)
+      finally:
+        consultor.cerrar_consultor()
+    finally:
+      os.chdir(directorio)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,174 @@
+'''
+Módulo: resolver_lotes.py
+Descripción: resuelve en lote (sin interfaz gráfica) todas las matrices de una carpeta o patrón,
+             en paralelo, y genera un reporte JSON o CSV
+
+Uso:
+  python programa/resolver_lotes.py programa/matrices -o reporte.csv
+  python programa/resolver_lotes.py "generadas/*.txt" --procesos 8 --motor python --modo minimo
+'''
+import argparse
+import csv
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import simplejson
+
+from modelos import reglas
+from modelos.motores import crear_consultor, MOTOR_PROLOG, MOTOR_PYTHON
+from modelos.cargador_matriz import filas_texto
+from modelos.grafo import GrafoDirigido
+from modelos.solucionador import MODO_EXPLORACION, MODO_MINIMO, MODO_TODOS_MINIMOS, MODO_K_MINIMOS
+
+COLUMNAS_REPORTE = [
+  'archivo', 'solucionable', 'longitud_solucion', 'celdas_solucion', 'posiciones_borradas',
+  'cruces', 'cruces_pendientes', 'tiempo_carga', 'tiempo_compilacion', 'tiempo_solucion',
+  'tiempo_total', 'limite', 'error'
+]
+
+def buscar_matrices(entradas):
+  """Obtiene los archivos de matrices a partir de carpetas, archivos o patrones glob
+
+  Args:
+      entradas (list<string>): carpetas, archivos o patrones
+
+  Returns:
+      list<string>: rutas absolutas de los archivos encontrados, sin repetir
+  """
+
+  archivos = []
+  for entrada in entradas:
+    if os.path.isdir(entrada):
+      encontrados = glob.glob(os.path.join(entrada, '*.txt'))
+    else:
+      encontrados = glob.glob(entrada)
+    archivos += sorted(os.path.abspath(archivo) for archivo in encontrados)
+  return list(dict.fromkeys(archivos))
+
+def resolver_matriz(archivo, motor, modo, carpeta_perfil = None, limite_tiempo = None):
+  """Resuelve una matriz y mide el tiempo de cada fase. Se ejecuta en un proceso del pool.
+
+  Args:
+      archivo (string): ruta absoluta de la matriz
+      motor (string): MOTOR_PYTHON o MOTOR_PROLOG
+      modo (string): modo de resolución del motor nativo
+      carpeta_perfil (string): carpeta donde se escribe el perfil de Prolog de cada matriz (opcional)
+      limite_tiempo (float): segundos máximos de resolución, None para el límite predeterminado del motor
+
+  Returns:
+      dict: fila del reporte
+  """
+
+  fila = dict.fromkeys(COLUMNAS_REPORTE)
+  fila['archivo'] = archivo
+  inicio = time.perf_counter()
+  consultor = None
+  try:
+    if motor == MOTOR_PYTHON:
+      consultor = crear_consultor(motor, modo=modo)
+      matriz = consultor.cargar_matriz(archivo)
+      fila['tiempo_carga'] = time.perf_counter() - inicio
+      momento = time.perf_counter()
+      consultor.set_posiciones_inic(matriz)
+      fila['tiempo_compilacion'] = time.perf_counter() - momento
+    else:
+      # Prolog carga y prepara la matriz en una sola consulta
+      consultor = crear_consultor(motor)
+      matriz = consultor.definir_valores_iniciales(archivo)
+      fila['tiempo_carga'] = time.perf_counter() - inicio
+      fila['tiempo_compilacion'] = 0.0
+
+    if limite_tiempo is not None:
+      consultor.limite_tiempo = limite_tiempo
+    momento = time.perf_counter()
+    if carpeta_perfil is not None and motor == MOTOR_PROLOG:
+      archivo_perfil = os.path.join(
+        carpeta_perfil, os.path.splitext(os.path.basename(archivo))[0] + '.perfil.json'
+      )
+      fila['solucionable'] = bool(consultor.solucionar(perfilar=True, archivo_perfil=archivo_perfil))
+    else:
+      fila['solucionable'] = bool(consultor.solucionar())
+    fila['tiempo_solucion'] = time.perf_counter() - momento
+    fila['limite'] = consultor.get_limite_alcanzado()
+
+    fila['cruces'] = sum(fila_txt.count(reglas.CRUCE) for fila_txt in filas_texto(matriz))
+    if fila['solucionable']:
+      camino = consultor.get_camino_solucion()
+      fila['celdas_solucion'] = len(camino)
+      # El camino solución de Prolog incluye los caminos alternativos de los cruces, por eso
+      # la longitud se toma de la búsqueda en anchura, igual para los dos motores
+      grafo = getattr(consultor, 'grafo', None) or GrafoDirigido(matriz)
+      distancias = grafo.distancias_hacia(grafo.indice_final)
+      fila['longitud_solucion'] = distancias[grafo.indice_inicial]
+      fila['posiciones_borradas'] = len(consultor.get_posiciones_borradas())
+      fila['cruces_pendientes'] = len(consultor.get_cruces_pendientes())
+  except Exception as error:
+    fila['error'] = '{}: {}'.format(type(error).__name__, error)
+  finally:
+    if consultor is not None:
+      consultor.cerrar_consultor()
+  fila['tiempo_total'] = time.perf_counter() - inicio
+  return fila
+
+def escribir_reporte(filas, salida):
+  """Escribe el reporte en CSV o JSON según la extensión; sin salida lo imprime en JSON
+
+  Args:
+      filas (list<dict>): filas del reporte
+      salida (string): ruta del archivo de salida, None para la salida estándar
+  """
+
+  if salida is None:
+    print(simplejson.dumps(filas, indent=2))
+  elif salida.lower().endswith('.csv'):
+    with open(salida, 'w', newline='') as file:
+      escritor = csv.DictWriter(file, fieldnames=COLUMNAS_REPORTE)
+      escritor.writeheader()
+      escritor.writerows(filas)
+  else:
+    with open(salida, 'w') as file:
+      file.write(simplejson.dumps(filas, indent=2))
+
+def main(argumentos = None):
+  parser = argparse.ArgumentParser(
+    description='Resuelve en lote laberintos dirigidos sin interfaz gráfica'
+  )
+  parser.add_argument('entradas', nargs='+', help='carpetas, archivos o patrones glob de matrices')
+  parser.add_argument('-o', '--salida', help='archivo del reporte (.json o .csv)')
+  parser.add_argument('-p', '--procesos', type=int, default=os.cpu_count(), help='procesos en paralelo')
+  parser.add_argument('--motor', choices=[MOTOR_PYTHON, MOTOR_PROLOG], default=MOTOR_PYTHON)
+  parser.add_argument(
+    '--modo', default=MODO_EXPLORACION,
+    choices=[MODO_EXPLORACION, MODO_MINIMO, MODO_TODOS_MINIMOS, MODO_K_MINIMOS],
+    help='modo de resolución del motor python'
+  )
+  parser.add_argument('--perfil', help='carpeta para el perfil de Prolog de cada matriz (solo motor prolog)')
+  parser.add_argument('--limite-tiempo', type=float, help='segundos máximos de resolución por matriz')
+  args = parser.parse_args(argumentos)
+
+  archivos = buscar_matrices(args.entradas)
+  if not archivos:
+    print('No se encontraron matrices', file=sys.stderr)
+    return 1
+  if args.perfil:
+    os.makedirs(args.perfil, exist_ok=True)
+
+  with ProcessPoolExecutor(max_workers=args.procesos) as executor:
+    filas = list(executor.map(
+      resolver_matriz, archivos, [args.motor] * len(archivos), [args.modo] * len(archivos),
+      [args.perfil] * len(archivos), [args.limite_tiempo] * len(archivos)
+    ))
+
+  escribir_reporte(filas, args.salida)
+  fallidas = sum(1 for fila in filas if fila['error'])
+  print('{} matrices, {} solucionables, {} con límite alcanzado, {} con error'.format(
+    len(filas), sum(1 for fila in filas if fila['solucionable']),
+    sum(1 for fila in filas if fila['limite']), fallidas
+  ), file=sys.stderr)
+  return 1 if fallidas else 0
+
+if __name__ == '__main__':
+  sys.exit(main())
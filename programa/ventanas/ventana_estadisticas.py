@@ -4,8 +4,12 @@ from tkinter import messagebox
 
 import ventanas.ventana_principal as vp
 
-from modelos.dao_partidas_json import DaoPartidasJson
+from modelos.persistencia import crear_dao
 from ventanas.ventana_repeticion import VentanaRepeticion
+
+TAMANO_PAGINA = 100 # Partidas que se cargan cada vez que la lista llega al final
+UMBRAL_CARGA = 0.9 # Fracción de la lista visible a partir de la cual se carga otra página
+
 class VentanaEstadisticas:
   """Ventana para mostrar estadísticas de juego
   """
@@ -71,7 +75,7 @@ class VentanaEstadisticas:
       command=self.tree.yview,
     )
     
-    self.tree.configure(yscrollcommand=self.vsb.set)
+    self.tree.configure(yscrollcommand=self.desplazar_lista)
     
     self.tree.bind("<Button-1>", self.onClick)
 
@@ -95,36 +99,66 @@ class VentanaEstadisticas:
     self.tree.column(6, width=100, anchor='center')
     self.tree.column(7, width=162, anchor='center')
 
-    dao_partidas = DaoPartidasJson()
-    # Insert data
-    partidas = dao_partidas.obtener_partidas()
-    
-    for partida in partidas:
+    # Las partidas se cargan por páginas (sin movimientos) conforme se desplaza la lista
+    self.dao_partidas = crear_dao()
+    self.partidas = {} # id de la fila -> resumen de la partida
+    self.desplazamiento = 0
+    self.hay_mas_partidas = True
+    self.carga_pendiente = False
+    self.cargar_pagina()
+    self.ventana.mainloop()
+  
+  def cargar_pagina(self):
+    """Agrega a la lista la siguiente página de partidas
+    """
+
+    self.carga_pendiente = False
+    if not self.hay_mas_partidas:
+      return
+
+    pagina = self.dao_partidas.listar_pagina(self.desplazamiento, TAMANO_PAGINA)
+    self.desplazamiento += len(pagina)
+    self.hay_mas_partidas = len(pagina) == TAMANO_PAGINA
+    for partida in pagina:
+      fila = str(partida['id'])
+      self.partidas[fila] = partida
       self.tree.insert(
         "",
         "end",
+        iid=fila,
         values=(
           partida['jugador'],
           partida['matriz'],
           partida['estado'],
           partida['tiempo'],
-          len(partida['movimientos']),
+          partida['cantMovimientos'],
           partida['cantSugerencias'],
           partida['fecha']
         )
       )
-    self.ventana.mainloop()
+
+  def desplazar_lista(self, inicio, fin):
+    """Actualiza la barra de desplazamiento y, si la parte visible llega cerca del final,
+       programa la carga de la siguiente página
+
+    Args:
+        inicio (string): Fracción inicial visible de la lista
+        fin (string): Fracción final visible de la lista
+    """
+
+    self.vsb.set(inicio, fin)
+    if (self.hay_mas_partidas and not self.carga_pendiente and float(fin) >= UMBRAL_CARGA):
+      self.carga_pendiente = True
+      self.ventana.after_idle(self.cargar_pagina)
   
   def mostrar_repeticion(self):
     if (self.tree.focus() != ''):
-      # Se pasa el valor a entero
-      fil = int(self.tree.focus().split('I')[1], 16) - 1
-      
-      dao = DaoPartidasJson()
-      partidas = dao.obtener_partidas()
+      # Los movimientos solo se cargan para la partida seleccionada
+      partida = dict(self.partidas[self.tree.focus()])
+      partida['movimientos'] = self.dao_partidas.obtener_movimientos(partida['id'])
       self.ventana.quit()
       self.ventana.destroy()
-      vtn_repeticion = VentanaRepeticion(partidas[fil])
+      vtn_repeticion = VentanaRepeticion(partida)
     else:
       messagebox.showinfo(
         "Error",
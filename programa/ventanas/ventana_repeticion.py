@@ -1,7 +1,7 @@
 import tkinter as tk
 from tkinter import messagebox
 
-from modelos.consultor import Consultor
+from modelos.cargador_matriz import leer_matriz
 import ventanas.ventana_estadisticas as ve
 
 class VentanaRepeticion:
@@ -27,11 +27,10 @@ class VentanaRepeticion:
     # Frame para la matriz
     self.frame_matriz = tk.Frame(self.frame, bg = 'RoyalBlue2')
     
-    self.cprolog = Consultor()
-    self.matriz = self.cprolog.definir_valores_iniciales(self.partida['matriz'])
+    # La repetición solo necesita la matriz, no se requiere un motor de resolución
+    self.matriz = leer_matriz(self.partida['matriz'])
     self.cant_fil = len(self.matriz)
     self.cant_col = len(self.matriz[0])
-    self.cprolog.cerrar_consultor()
     
     self.mostrar_laberinto_gui()
     self.mostrar_repeticion_gui()